@@ -1,89 +1,66 @@
 import sys
+import os
 import time
-import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QLineEdit,
-    QTableWidget, QTableWidgetItem, QProgressBar, QMessageBox, QHeaderView, QSpacerItem, QSizePolicy, QFrame
+    QTableView, QProgressBar, QMessageBox, QHeaderView, QSpacerItem, QSizePolicy, QFrame
 )
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
 from PyQt5.QtGui import QIcon, QColor, QPainter, QBrush, QLinearGradient, QPixmap
 import ctypes  # Import ctypes for setting the AppUserModelID
 
-from multiprocessing import Process, Event, Queue
-import scrapy  # Import scrapy
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
-from scrapy import signals
-from pydispatch import dispatcher
+from multiprocessing import Event
+# Only Qt and light modules are imported at startup. Scrapy (and the spider with its
+# dependencies) is imported when a crawl starts; the crawl processes import it from
+# phoneScrapper.runner. Check with: python -m phoneScrapper.import_time
+from phoneScrapper.transport import iter_item_batches
+from phoneScrapper.inputs import count_domains
+from phoneScrapper.checkpoint import CrawlCheckpoint, checkpoint_dir_for
+from phoneScrapper.sharding import resolve_workers, shard_path
+from phoneScrapper.worker import CrawlWorkerPool
 
 # Set the AppUserModelID to ensure the taskbar icon appears
-ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('company.app.1')
-
-def run_spider(domains, item_queue, spider_closed_event, pause_event):
-    settings = get_project_settings()
-    process = CrawlerProcess(settings=settings)
-
-    class CustomPhoneScrapperSpider(PhoneScrapperSpider):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            dispatcher.connect(self.item_scraped_callback, signal=signals.item_scraped)
-            dispatcher.connect(self.spider_closed_callback, signal=signals.spider_closed)
-            self.pause_event = pause_event
-
-        def item_scraped_callback(self, item, response, spider):
-            item_queue.put(dict(item))  # Put scraped items into the queue
-
-        def spider_closed_callback(self, spider):
-            spider_closed_event.set()  # Set the event to indicate the spider has closed
-
-        def start_requests(self):
-            urls = [self.convert_to_url(domain) for domain in self.domains]
-            self.logger.info(f"Starting requests for {len(urls)} URLs")
-            for url in urls:
-                self.logger.info(f"Requesting URL: {url}")
-                while self.pause_event.is_set():  # Check pause event
-                    self.logger.info(f"Pausing URL request: {url}")
-                    time.sleep(1)
-                yield scrapy.Request(url=url, callback=self.parse, errback=self.errback_handle, meta={'parent_url': url, 'is_parent': True})
-
-    process.crawl(CustomPhoneScrapperSpider, domains=domains)
-    process.start()
-    process.stop()
+if sys.platform == 'win32':
+    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('company.app.1')
 
 class ScrapingThread(QThread):
-    item_scraped = pyqtSignal(dict)
+    items_scraped = pyqtSignal(list)  # Emit each batch of scraped items
     spider_closed = pyqtSignal()
-    url_processed = pyqtSignal(int, int)  # Emit total contacts found and not found for each URL
+    url_processed = pyqtSignal(int, int, int)  # Emit URLs processed, contacts found and not found for each batch
 
-    def __init__(self, domains, pause_event):
+    def __init__(self, pool, domains=None, domains_file=None, checkpoint_dir=None, resume=False, results_path=None, workers=None):
         super().__init__()
+        self.pool = pool  # Warm crawl processes, kept between runs
         self.domains = domains
-        self.pause_event = pause_event
-        self.item_queue = Queue()
-        self.spider_closed_event = Event()
-        self.process = None
+        self.domains_file = domains_file  # Streamed by the spider instead of sending the list to the process
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+        self.results_path = results_path
+        self.workers = workers  # Pool workers to use, each taking the domains of one shard; all by default
 
     def run(self):
-        self.process = Process(target=run_spider, args=(self.domains, self.item_queue, self.spider_closed_event, self.pause_event))
-        self.process.start()
-        self.monitor_queue()
-
-    def monitor_queue(self):
-        while self.process.is_alive() or not self.item_queue.empty():
-            if not self.item_queue.empty():
-                item = self.item_queue.get()
-                self.item_scraped.emit(item)
-                total_found = sum(1 for key in ['phone_number_1', 'phone_number_2', 'phone_number_3'] if item.get(key))
-                total_not_found = 3 - total_found
-                self.url_processed.emit(total_found, total_not_found)
+        # All workers share the item queue and the pause event; checkpoints and results files are per shard
+        producers = self.pool.crawl(domains=self.domains, domains_file=self.domains_file, checkpoint_dir=self.checkpoint_dir,
+                                    resume=self.resume, results_path=self.results_path, workers=self.workers)
+        self.monitor_queue(producers)
+
+    def monitor_queue(self, producers):
+        # Blocks until a batch arrives; ends once every worker sent its end-of-stream marker or all died
+        for batch in iter_item_batches(self.pool.item_queue, self.pool.is_alive, producers=producers):
+            self.items_scraped.emit(batch)
+            # Each domain has exactly one final record; provisional ones are only shown
+            final_items = [item for item in batch if item.get('final', True)]
+            if not final_items:
+                continue
+            total_found = sum(1 for item in final_items for key in ['phone_number_1', 'phone_number_2', 'phone_number_3'] if item.get(key))
+            total_not_found = 3 * len(final_items) - total_found
+            self.url_processed.emit(len(final_items), total_found, total_not_found)
         self.spider_closed.emit()
 
     def stop(self):
-        if self.process and self.process.is_alive():
-            self.process.terminate()
-        self.process.join()
+        # The workers close their spiders and end their item streams, then wait for the next crawl
+        self.pool.stop_crawl()
 
 class GradientWidget(QWidget):
     def __init__(self):
@@ -120,6 +97,88 @@ class IconAfterTextButton(QPushButton):
         }
         """)
 
+class ResultsTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model for the scraped results, stored column by column.
+
+    Items passed to append_items are buffered and inserted in one batch when the
+    flush timer fires, so a burst of items costs a single row insertion. An item
+    for a url already in the table (the final record after a provisional one)
+    replaces that row. The serial number column is computed from the row and not
+    stored.
+    """
+
+    HEADERS = ["Sl.", "🌐 Website", "Phone Number 1️⃣", "🗺️ Country", "Phone Number 2️⃣", "🗺️ Country", "Phone Number 3️⃣", "🗺️ Country"]
+    FIELDS = ['url', 'phone_number_1', 'country_1', 'phone_number_2', 'country_2', 'phone_number_3', 'country_3']
+    EXPORT_HEADERS = ["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"]
+
+    def __init__(self, flush_interval=100, parent=None):
+        super().__init__(parent)
+        self.columns = [[] for _ in self.FIELDS]
+        self.row_of_url = {}
+        self.pending = []
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(flush_interval)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns[0])
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        if index.column() == 0:
+            return str(index.row() + 1)
+        return self.columns[index.column() - 1][index.row()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def append_items(self, items):
+        self.pending.extend(items)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        if not self.pending:
+            return
+        new_items = {}
+        for item in self.pending:
+            row = self.row_of_url.get(item.get('url'))
+            if row is None:
+                new_items[item.get('url')] = item
+                continue
+            for column, field in zip(self.columns, self.FIELDS):
+                column[row] = item.get(field) or ''
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+        self.pending = []
+        if not new_items:
+            return
+
+        first = len(self.columns[0])
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(new_items) - 1)
+        for column, field in zip(self.columns, self.FIELDS):
+            column.extend(item.get(field) or '' for item in new_items.values())
+        self.row_of_url.update((url, row) for row, url in enumerate(new_items, first))
+        self.endInsertRows()
+
+    def clear(self):
+        self.flush_timer.stop()
+        self.beginResetModel()
+        self.columns = [[] for _ in self.FIELDS]
+        self.row_of_url = {}
+        self.pending = []
+        self.endResetModel()
+
+    def __len__(self):
+        return len(self.columns[0]) + len(self.pending)
+
 class ScrapingApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -128,8 +187,11 @@ class ScrapingApp(QMainWindow):
         self.setWindowIcon(QIcon('phoneScrapper/left_arrow.ico'))
 
         self.file_path = ""
-        self.scraped_data = []
+        self.total_domains = 0
+        self.results_paths = []  # Results files the running or last crawl streams to, one per worker
+        self.results_model = ResultsTableModel(parent=self)
         self.pause_event = Event()
+        self.crawl_pool = CrawlWorkerPool(1, self.pause_event)  # Resized to CRAWL_WORKERS for file crawls
         self.scraping_thread = None
         self.start_time = None
 
@@ -146,12 +208,18 @@ class ScrapingApp(QMainWindow):
         # Table layout on the left side
         table_layout = QVBoxLayout()
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["Sl.", "🌐 Website", "Phone Number 1️⃣", "🗺️ Country", "Phone Number 2️⃣", "🗺️ Country", "Phone Number 3️⃣", "🗺️ Country"])
+        self.table = QTableView()
+        self.table.setModel(self.results_model)
+
+        # Let the view paint alternating row colors instead of styling every cell
+        self.table.setAlternatingRowColors(True)
 
-        # Set custom stylesheet for header
+        # Set custom stylesheet for header and rows
         self.table.setStyleSheet("""
+            QTableView {
+                background-color: #f0f0f0;
+                alternate-background-color: #ffffff;
+            }
             QHeaderView::section {
                 background-color: #E6E6FA;
                 color: black;
@@ -163,6 +231,7 @@ class ScrapingApp(QMainWindow):
 
         # Hide the vertical header to remove the default row numbers
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Skip per-row height calculation
 
         # Allow manual resizing of columns
         header = self.table.horizontalHeader()
@@ -555,36 +624,60 @@ class ScrapingApp(QMainWindow):
         self.timer.timeout.connect(self.update_time)
         self.timer.start(1000)
 
+        # Start a crawl worker once the window is up, so it is warm by the first lookup
+        QTimer.singleShot(0, self.crawl_pool.start)
+
     def browse_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Excel file", "", "Excel files (*.xlsx)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select domain list", "", "Domain lists (*.xlsx *.csv *.txt)")
         if file_path:
+            try:
+                self.total_domains = count_domains(file_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to read domain file: {e}")
+                return
             self.file_path = file_path
-            self.domain_count_label.setText(f"Total domains: {len(pd.read_excel(file_path, header=None)[0])}")
+            self.domain_count_label.setText(f"Total domains: {self.total_domains}")
             self.file_path_label.setText(file_path)
 
     def start_scraping(self):
         if not self.file_path:
-            QMessageBox.warning(self, "Warning", "Please select an Excel file first.")
+            QMessageBox.warning(self, "Warning", "Please select a domain file first.")
             return
         if self.scraping_thread and self.scraping_thread.isRunning():
             QMessageBox.warning(self, "Warning", "Scraping is already running.")
             return
         try:
-            self.domains = pd.read_excel(self.file_path, header=None)[0].tolist()
-            self.domain_count_label.setText(f"Total domains: {len(self.domains)}")
+            self.total_domains = count_domains(self.file_path)
+            self.domain_count_label.setText(f"Total domains: {self.total_domains}")
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read Excel file: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to read domain file: {e}")
             return
 
-        self.scraped_data.clear()
+        from scrapy.utils.project import get_project_settings
+        from phoneScrapper.sinks import results_path_for
+
+        # Offer to continue an earlier crawl of the same file that was stopped or interrupted
+        workers = resolve_workers(get_project_settings().getint('CRAWL_WORKERS', 1))
+        checkpoint_dir = checkpoint_dir_for(self.file_path)
+        resume = False
+        if any(CrawlCheckpoint.exists(shard_path(checkpoint_dir, shard, workers)) for shard in range(workers)):
+            answer = QMessageBox.question(self, "Resume", "A previous crawl of this file did not finish. Resume it?\n"
+                                          "Choose No to start over.", QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+            resume = answer == QMessageBox.Yes
+
+        self.results_model.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
 
-        self.scraping_thread = ScrapingThread(self.domains, self.pause_event)
-        self.scraping_thread.item_scraped.connect(self.item_scraped)
+        results_path = results_path_for(self.file_path)
+        self.results_paths = [shard_path(results_path, shard, workers) for shard in range(workers)]
+        self.crawl_pool.resize(workers)
+        self.scraping_thread = ScrapingThread(self.crawl_pool, domains_file=self.file_path,
+                                              checkpoint_dir=checkpoint_dir, resume=resume,
+                                              results_path=results_path)
+        self.scraping_thread.items_scraped.connect(self.items_scraped)
         self.scraping_thread.spider_closed.connect(self.spider_closed)
         self.scraping_thread.url_processed.connect(self.update_counts)  # Connect the url_processed signal
         self.start_time = time.time()  # Set the start time here
@@ -596,53 +689,39 @@ class ScrapingApp(QMainWindow):
         if not single_url:
             QMessageBox.warning(self, "Warning", "Please enter a single domain.")
             return
+        if self.scraping_thread and self.scraping_thread.isRunning():
+            QMessageBox.warning(self, "Warning", "Scraping is already running.")
+            return
+
+        from phoneScrapper.sinks import DEFAULT_RESULTS_ROOT
 
-        self.scraped_data.clear()
+        self.results_model.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
 
-        self.domains = [single_url]  # Set the single domain
-        self.scraping_thread = ScrapingThread(self.domains, self.pause_event)
-        self.scraping_thread.item_scraped.connect(self.item_scraped)
+        self.total_domains = 1
+        results_path = os.path.join(DEFAULT_RESULTS_ROOT, 'single_domain.csv')
+        self.results_paths = [results_path]
+        self.scraping_thread = ScrapingThread(self.crawl_pool, [single_url],  # Set the single domain
+                                              results_path=results_path, workers=1)
+        self.scraping_thread.items_scraped.connect(self.items_scraped)
         self.scraping_thread.spider_closed.connect(self.spider_closed)
         self.scraping_thread.url_processed.connect(self.update_counts) 
         self.start_time = time.time() 
         self.scraping_thread.start()
         self.single_start_button.setEnabled(False)
 
-    def item_scraped(self, item):
-        print("Item Scraped:", item)  # Debug statement
-        row_data = [
-            str(len(self.scraped_data) + 1),  # Serial number
-            item.get('url', ''),
-            item.get('phone_number_1', ''),
-            item.get('country_1', ''),
-            item.get('phone_number_2', ''),
-            item.get('country_2', ''),
-            item.get('phone_number_3', ''),
-            item.get('country_3', ''),
-        ]
-
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        for i, data in enumerate(row_data):
-            cell_item = QTableWidgetItem(data)
-            if row % 2 == 0:  # Even row
-                cell_item.setBackground(QColor("#f0f0f0"))
-            else:  # Odd row
-                cell_item.setBackground(QColor("#ffffff"))
-            self.table.setItem(row, i, cell_item)
-        
-        self.scraped_data.append(row_data)
+    def items_scraped(self, items):
+        self.results_model.append_items(items)  # Rows are inserted in batches by the model's flush timer
 
-    def update_counts(self, total_found, total_not_found):
-        self.total_urls_processed += 1
+    def update_counts(self, urls_processed, total_found, total_not_found):
+        self.total_urls_processed += urls_processed
         self.total_contact_found += total_found
         self.total_contact_not_found += total_not_found
-        success_rate = (self.total_contact_found / (self.total_contact_found + self.total_contact_not_found)) * 100
+        total_contacts = self.total_contact_found + self.total_contact_not_found
+        success_rate = self.total_contact_found / total_contacts * 100 if total_contacts else 0
 
         self.total_urls_processed_label.setText(f"Total URLs Processed: {self.total_urls_processed}")
         self.total_contact_found_label.setText(f"Contact Numbers Found: {self.total_contact_found}")
@@ -652,9 +731,8 @@ class ScrapingApp(QMainWindow):
         self.update_progress_bar()
 
     def update_progress_bar(self):
-        progress = (self.total_urls_processed / len(self.domains)) * 100 if self.domains else 0
-        self.progress_bar.setValue(progress)
-        QApplication.processEvents()  
+        progress = min(self.total_urls_processed / self.total_domains, 1) * 100 if self.total_domains else 0
+        self.progress_bar.setValue(int(progress))
 
     def spider_closed(self):
         elapsed_time = time.time() - self.start_time
@@ -667,10 +745,10 @@ class ScrapingApp(QMainWindow):
 
     def clear_results(self):
         self.file_path = ""
+        self.total_domains = 0
         self.browse_button.setStyleSheet("")
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
-        self.scraped_data.clear()
+        self.results_model.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
@@ -689,16 +767,20 @@ class ScrapingApp(QMainWindow):
         if self.scraping_thread:
             self.scraping_thread.stop()
 
+    def closeEvent(self, event):
+        self.crawl_pool.shutdown()  # Stops a running crawl, keeping its checkpoint
+        super().closeEvent(event)
+
     def pause_scraping(self):
         self.pause_event.set()
 
     def show_help(self):
         help_text = (
             "<h2>Phone Number Scraper Help</h2>"
-            "<p>This application allows you to scrape phone numbers from a list of websites provided in an Excel file.</p>"
+            "<p>This application allows you to scrape phone numbers from a list of websites provided in an Excel, CSV or text file.</p>"
             "<h3>How to Use:</h3>"
             "<ol>"
-            "<li><b>Select Excel File:</b> Click the browse button to select an Excel file containing the list of domains you want to scrape.</li>"
+            "<li><b>Select Excel File:</b> Click the browse button to select an Excel (.xlsx), CSV or text file with the domains you want to scrape in the first column.</li>"
             "<li><b>Start Scraping:</b> Click the 'Start' button to begin scraping phone numbers from the domains.</li>"
             "<li><b>Pause/Resume Scraping:</b> Use the 'Pause' button to pause the scraping process and the 'Resume' button to continue.</li>"
             "<li><b>Stop Scraping:</b> Click the 'Stop' button to stop the scraping process.</li>"
@@ -727,7 +809,7 @@ class ScrapingApp(QMainWindow):
         self.pause_event.clear()
 
     def save_results(self, filetype):
-        if not self.scraped_data:
+        if not len(self.results_model) or not any(os.path.exists(path) for path in self.results_paths):
             QMessageBox.warning(self, "Warning", "No data to save.")
             return
 
@@ -741,17 +823,20 @@ class ScrapingApp(QMainWindow):
                 self._save_as_excel(file_path)
 
     def _save_as_csv(self, file_path):
+        from phoneScrapper.sinks import export_results
+
         try:
-            df = pd.DataFrame(self.scraped_data, columns=["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"])
-            df.to_csv(file_path, index=False)
+            # Streamed from the results file the crawl writes, not from the table
+            export_results(self.results_paths, file_path, headers=ResultsTableModel.EXPORT_HEADERS, number_rows=True)
             QMessageBox.information(self, "Info", "Data saved successfully as CSV.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save data as CSV: {e}")
 
     def _save_as_excel(self, file_path):
+        from phoneScrapper.sinks import export_results
+
         try:
-            df = pd.DataFrame(self.scraped_data, columns=["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"])
-            df.to_excel(file_path, index=False)
+            export_results(self.results_paths, file_path, headers=ResultsTableModel.EXPORT_HEADERS, number_rows=True)
             QMessageBox.information(self, "Info", "Data saved successfully as Excel.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save data as Excel: {e}")
@@ -762,7 +847,7 @@ class ScrapingApp(QMainWindow):
             self.time_label.setText(f"Elapsed time: {elapsed_time:.2f}s")
 
             # Estimate remaining time based on progress
-            progress = len(self.scraped_data) / len(self.domains) if self.domains else 0
+            progress = len(self.results_model) / self.total_domains if self.total_domains else 0
             if progress > 0:
                 total_time = elapsed_time / progress
                 remaining_time = total_time - elapsed_time
@@ -0,0 +1,5 @@
+import sys
+
+from phoneScrapper.cli import main
+
+sys.exit(main())
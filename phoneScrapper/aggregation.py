@@ -0,0 +1,129 @@
+from phoneScrapper.items import PhoneScrapperItem
+
+
+class DomainResultAggregator:
+    """
+    Phone numbers found for each domain over all its pages, and the records emitted for them.
+
+    Emission contract:
+
+    * Every domain the crawl finishes gets exactly one final record (item['final']
+      is True), with the first numbers_per_domain distinct numbers found on any of
+      its pages, in the order they were found. Domains without numbers get a
+      record with only their url.
+    * A domain is finished once it has numbers_per_domain numbers or none of its
+      requests are outstanding. finish() queues its final record and pop_ready()
+      hands it out; the spider returns it from the callback or errback that
+      finished the domain, so it passes through the item pipelines. Records of
+      domains finished where nothing can be returned (a request dropped by the
+      scheduler) or never seen finishing are emitted when the spider goes idle.
+    * A crawl stopped early emits final records only for the domains that got
+      at least one response or failure (see visit()) or have numbers; the others
+      were never crawled and get no record, so a resumed crawl requests them.
+    * With provisional enabled, a domain's first numbers are also emitted right
+      away as a record with item['final'] False. Consumers enabling it must replace
+      that record by url when the final one arrives; the result sink skips it.
+
+    Only the urls of finished domains are kept once their final record was popped,
+    so memory grows with the domains in flight, not with the size of the crawl.
+    Numbers found for a finished domain after that are ignored.
+    """
+
+    def __init__(self, numbers_per_domain=3, provisional=False):
+        self.numbers_per_domain = numbers_per_domain
+        self.provisional = provisional
+        self.numbers = {}
+        self.ready = []
+        self.emitted = set()
+        self.provisional_emitted = set()
+        self.visited = set()
+
+    def start(self, parent_url):
+        if parent_url not in self.emitted:
+            self.numbers.setdefault(parent_url, [])
+
+    def visit(self, parent_url):
+        """Record that one of the domain's requests got a response or failed."""
+        if parent_url not in self.emitted:
+            self.visited.add(parent_url)
+
+    def add(self, parent_url, numbers_with_countries):
+        """Merge numbers found on a page of the domain; return the (number, country) pairs that were kept as new."""
+        if parent_url in self.emitted:
+            return []
+        numbers = self.numbers.setdefault(parent_url, [])
+        known = {number for number, _ in numbers}
+        new = []
+        for number, country in numbers_with_countries:
+            if len(numbers) >= self.numbers_per_domain:
+                break
+            if number not in known:
+                known.add(number)
+                numbers.append((number, country))
+                new.append((number, country))
+        return new
+
+    def get(self, parent_url):
+        return self.numbers.get(parent_url, [])
+
+    def is_complete(self, parent_url):
+        return len(self.get(parent_url)) >= self.numbers_per_domain
+
+    def is_finished(self, parent_url):
+        return parent_url in self.emitted
+
+    def mark_emitted(self, parent_url):
+        """Record that the domain's final record was already delivered, e.g. by an earlier run."""
+        self.emitted.add(parent_url)
+        self._forget(parent_url)
+
+    def provisional_item(self, parent_url):
+        """Return the early record of the domain the first time it has numbers, if provisional records are enabled."""
+        if (not self.provisional or parent_url in self.provisional_emitted
+                or parent_url in self.emitted or not self.get(parent_url)):
+            return None
+        self.provisional_emitted.add(parent_url)
+        return self.build_item(parent_url, final=False)
+
+    def finish(self, parent_url):
+        if parent_url not in self.emitted:
+            self.emitted.add(parent_url)
+            self.ready.append(parent_url)
+
+    def finish_all(self):
+        """Finish every domain that was started and has not been emitted yet."""
+        for parent_url in self.numbers:
+            self.finish(parent_url)
+
+    def finish_visited(self):
+        """Finish the domains that were visited or have numbers; for a crawl stopped early."""
+        for parent_url, numbers in self.numbers.items():
+            if numbers or parent_url in self.visited:
+                self.finish(parent_url)
+
+    def has_unfinished(self):
+        # numbers only holds domains still open or waiting in ready
+        return bool(self.ready) or bool(self.numbers)
+
+    def pop_ready(self):
+        """Return the final records of the domains finished since the last call."""
+        ready, self.ready = self.ready, []
+        items = []
+        for parent_url in ready:
+            items.append(self.build_item(parent_url, final=True))
+            self._forget(parent_url)
+        return items
+
+    def _forget(self, parent_url):
+        self.numbers.pop(parent_url, None)
+        self.visited.discard(parent_url)
+        self.provisional_emitted.discard(parent_url)
+
+    def build_item(self, parent_url, final=True):
+        item = PhoneScrapperItem()
+        item['url'] = parent_url
+        for i, (phone_number, country_code) in enumerate(self.get(parent_url)[:self.numbers_per_domain]):
+            item[f'phone_number_{i+1}'] = phone_number
+            item[f'country_{i+1}'] = country_code
+        item['final'] = final
+        return item
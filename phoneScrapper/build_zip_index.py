@@ -0,0 +1,103 @@
+"""
+Build the ZIP/postal code index used by the spider from the Excel sources.
+
+    python -m phoneScrapper.build_zip_index [--source PATH=COUNTRY ...] [--output PATH] [--force]
+
+Without --source, the USA_Data.xlsx (US) and Canada_Data.xlsx (CA) files next to
+the output are used. The index records a checksum of its sources and is only
+rebuilt when they change, unless --force is given.
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+from phoneScrapper.zip_index import DEFAULT_SOURCES, DEFAULT_ZIP_INDEX_PATH, SNAPSHOT_VERSION, ZipIndex
+
+
+def default_sources(output):
+    directory = os.path.dirname(os.path.abspath(output))
+    return [(os.path.join(directory, name), country) for name, country in DEFAULT_SOURCES
+            if os.path.exists(os.path.join(directory, name))]
+
+
+def sources_digest(sources):
+    """Checksum of the source files' contents and the country each one is assigned to."""
+    digest = hashlib.sha256(f'v{SNAPSHOT_VERSION}'.encode())
+    for path, country in sources:
+        digest.update(f'{os.path.basename(path)}={country}\0'.encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.digest()
+
+
+def read_excel_postal_codes(path, column='Zip'):
+    """Yield the values of column from the first sheet of an Excel file, streaming the rows."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        if column not in header:
+            raise ValueError(f"{path} has no '{column}' column")
+        position = header.index(column)
+        for row in rows:
+            if position < len(row) and row[position] is not None:
+                yield row[position]
+    finally:
+        workbook.close()
+
+
+def build_zip_index(sources, output=DEFAULT_ZIP_INDEX_PATH, force=False):
+    """
+    Make sure output holds the index for sources, a list of (Excel path, country code).
+
+    Returns (index, rebuilt). The existing index is reused when its checksum matches
+    the sources, so callers can run this on every start.
+    """
+    digest = sources_digest(sources)
+    if not force and os.path.exists(output):
+        try:
+            index = ZipIndex.load(output)
+        except ValueError:
+            pass
+        else:
+            if index.source_digest == digest:
+                return index, False
+
+    pairs = ((code, country) for path, country in sources for code in read_excel_postal_codes(path))
+    index = ZipIndex.from_pairs(pairs, source_digest=digest)
+    index.save(output)
+    return index, True
+
+
+def parse_source(value):
+    path, separator, country = value.rpartition('=')
+    if not separator or not path or len(country) != 2:
+        raise argparse.ArgumentTypeError(f"expected PATH=COUNTRY, got '{value}'")
+    return path, country.upper()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m phoneScrapper.build_zip_index',
+                                     description="Build the ZIP/postal code to country index.")
+    parser.add_argument('--source', action='append', type=parse_source, metavar='PATH=COUNTRY',
+                        help="Excel file with a Zip column and the country its codes belong to (repeatable)")
+    parser.add_argument('--output', default=DEFAULT_ZIP_INDEX_PATH, help="index file to write")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the sources are unchanged")
+    args = parser.parse_args(argv)
+
+    sources = args.source or default_sources(args.output)
+    if not sources:
+        parser.error("no sources given and none found next to the output file")
+
+    index, rebuilt = build_zip_index(sources, args.output, force=args.force)
+    status = "Built" if rebuilt else "Up to date:"
+    print(f"{status} {args.output} ({len(index)} postal codes, countries: {', '.join(index.countries)})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import shutil
+
+# Checkpoints of GUI crawls are kept under this directory, one per input file
+DEFAULT_CHECKPOINT_ROOT = 'checkpoints'
+JOURNAL_NAME = 'domains.jsonl'
+
+
+def checkpoint_dir_for(source, root=DEFAULT_CHECKPOINT_ROOT):
+    """Checkpoint directory of a crawl of the domain file source."""
+    name = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16]
+    return os.path.join(root, name)
+
+
+class CrawlCheckpoint:
+    """
+    On-disk record of a crawl's per-domain results, so an interrupted crawl can resume.
+
+    The checkpoint is a JSON lines journal in directory with one line per update:
+    {"url": parent_url, "numbers": [[number, country], ...], "done": bool}. The last
+    line of a domain wins. Updates are buffered by record() and appended by flush(),
+    which the CheckpointControl extension calls periodically, so at most one flush
+    interval of work is lost when the process is killed. On open and close the
+    journal is compacted to one line per domain. A crawl that finishes normally
+    removes its checkpoint.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_NAME)
+        self.results = {}
+        self.completed = set()
+        self.buffer = []
+        self.file = None
+
+    @classmethod
+    def from_settings(cls, settings):
+        directory = settings.get('CHECKPOINT_DIR')
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, JOURNAL_NAME))
+
+    def open(self, resume=False):
+        """Open the journal, reloading its state if resume is true and starting empty otherwise."""
+        os.makedirs(self.directory, exist_ok=True)
+        if resume:
+            self.load()
+        self.compact()
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def load(self):
+        try:
+            f = open(self.path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Last line cut short when the process was killed
+                url = record['url']
+                self.results[url] = [tuple(number) for number in record['numbers']]
+                if record.get('done'):
+                    self.completed.add(url)
+
+    def is_completed(self, url):
+        return url in self.completed
+
+    def record(self, url, numbers, done=False):
+        """Save the numbers found so far for url, and whether the domain is finished."""
+        if url in self.completed:
+            return
+        numbers = [tuple(number) for number in numbers]
+        self.results[url] = numbers
+        if done:
+            self.completed.add(url)
+        self.buffer.append(self._line(url, numbers, done))
+
+    def flush(self):
+        if not self.buffer or self.file is None:
+            return
+        self.file.write(''.join(self.buffer))
+        self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def compact(self):
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            for url, numbers in self.results.items():
+                f.write(self._line(url, numbers, url in self.completed))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.path)
+
+    def close(self, finished=False):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+        if finished:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            self.compact()
+
+    @staticmethod
+    def _line(url, numbers, done):
+        return json.dumps({'url': url, 'numbers': numbers, 'done': done}) + '\n'
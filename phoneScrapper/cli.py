@@ -0,0 +1,159 @@
+"""
+Crawl a domain file without the GUI, printing progress as JSON lines.
+
+    python -m phoneScrapper DOMAINS_FILE [--output PATH] [--workers N] [--resume] ...
+
+Domains are streamed from DOMAINS_FILE (.xlsx, .csv or .txt) and one record per
+domain is appended to --output (.csv, .jsonl or .parquet) as results arrive.
+Progress goes to stdout, one JSON object per line:
+
+    {"event": "progress", "domains_done": 120, "domains_total": 1000, "found": 80,
+     "not_found": 40, "numbers": 190, "elapsed": 61.2, "rate": 1.96, "eta": 448.9}
+
+Progress lines are printed every --progress-interval seconds, also while no
+results arrive, followed by a last line with "event": "finished", or
+"interrupted" (exit code 130) or "failed" (exit code 1) if a crawl process
+failed or ended without reporting all of its results. Scrapy logs go to stderr.
+"""
+import argparse
+import json
+import signal
+import sys
+import time
+from multiprocessing import Event, Queue
+
+from phoneScrapper.checkpoint import checkpoint_dir_for
+from phoneScrapper.inputs import count_domains
+from phoneScrapper.items import result_fields
+from phoneScrapper.runner import start_workers
+from phoneScrapper.sharding import resolve_workers
+from phoneScrapper.sinks import open_result_sink, results_path_for
+from phoneScrapper.transport import StreamEndedEarly, iter_item_batches
+
+
+class ProgressReport:
+    """Counts of a running crawl, from the final records of the finished domains."""
+
+    def __init__(self, total, stream=sys.stdout):
+        self.total = total
+        self.stream = stream
+        self.started = time.monotonic()
+        self.done = 0
+        self.found = 0
+        self.not_found = 0
+        self.numbers = 0
+        self.number_fields = [field for field in result_fields() if field.startswith('phone_number_')]
+
+    def add(self, item):
+        numbers = sum(1 for field in self.number_fields if item.get(field))
+        self.done += 1
+        self.numbers += numbers
+        if numbers:
+            self.found += 1
+        else:
+            self.not_found += 1
+
+    def snapshot(self, event='progress'):
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        remaining = max(self.total - self.done, 0)
+        return {
+            'event': event,
+            'domains_done': self.done,
+            'domains_total': self.total,
+            'found': self.found,
+            'not_found': self.not_found,
+            'numbers': self.numbers,
+            'elapsed': round(elapsed, 1),
+            'rate': round(rate, 2),
+            'eta': round(remaining / rate, 1) if rate else None,
+        }
+
+    def emit(self, event='progress'):
+        self.stream.write(json.dumps(self.snapshot(event)) + '\n')
+        self.stream.flush()
+
+
+def main(argv=None):
+    from scrapy.utils.project import get_project_settings
+
+    parser = argparse.ArgumentParser(prog='python -m phoneScrapper',
+                                     description="Scrape phone numbers for a list of domains, without the GUI.")
+    parser.add_argument('domains_file', help="domain list (.xlsx, .csv or .txt), domains in the first column")
+    parser.add_argument('--output', help="results file (.csv, .jsonl or .parquet); default: under results/")
+    parser.add_argument('--workers', type=int, help="crawl processes, 0 for one per CPU core; default: CRAWL_WORKERS")
+    parser.add_argument('--resume', action='store_true', help="continue the interrupted crawl of this file")
+    parser.add_argument('--checkpoint-dir', help="checkpoint directory; default: under checkpoints/")
+    parser.add_argument('--no-checkpoint', action='store_true', help="do not checkpoint the crawl")
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument('--log-level', default='INFO', help="Scrapy log level (logs go to stderr)")
+    args = parser.parse_args(argv)
+
+    settings = get_project_settings()
+    workers = resolve_workers(args.workers if args.workers is not None else settings.getint('CRAWL_WORKERS', 1))
+    output = args.output or results_path_for(args.domains_file)
+    checkpoint_dir = None if args.no_checkpoint else args.checkpoint_dir or checkpoint_dir_for(args.domains_file)
+
+    progress = ProgressReport(count_domains(args.domains_file))
+    try:
+        sink = open_result_sink(output, append=args.resume)
+    except ValueError as e:
+        parser.error(str(e))
+    item_queue = Queue()
+    processes = start_workers(item_queue, Event(), Event(), domains_file=args.domains_file, workers=workers,
+                              checkpoint_dir=checkpoint_dir, resume=args.resume,
+                              extra_settings={'LOG_LEVEL': args.log_level})
+
+    interrupted = []
+
+    def on_interrupt(signum, frame):
+        # The workers got Ctrl+C too and are shutting down; keep reading until each
+        # one sent END_OF_STREAM, as their last records are already marked done in
+        # the checkpoints. A second Ctrl+C stops reading.
+        interrupted.append(signum)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, on_interrupt)
+
+    last_report = time.monotonic()
+
+    def report_progress():
+        # Called after each batch and whenever no batch came for a second, so slow stretches still report
+        nonlocal last_report
+        if time.monotonic() - last_report >= args.progress_interval:
+            sink.flush()
+            progress.emit()
+            last_report = time.monotonic()
+
+    failed = False
+    try:
+        for batch in iter_item_batches(item_queue, lambda: any(p.is_alive() for p in processes), producers=workers,
+                                       on_idle=report_progress, strict=True):
+            for item in batch:
+                if item.get('final', True):
+                    sink.write(item)
+                    progress.add(item)
+            report_progress()
+    except StreamEndedEarly as e:
+        print(f"Crawl process failed: {e}", file=sys.stderr)
+        failed = True
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for process in processes:
+            process.join()
+        sink.close()
+
+    if interrupted:
+        progress.emit('interrupted')
+        return 130
+    if failed or any(process.exitcode != 0 for process in processes):
+        progress.emit('failed')
+        return 1
+    progress.emit('finished')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
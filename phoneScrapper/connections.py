@@ -0,0 +1,192 @@
+import asyncio
+import ipaddress
+import json
+import os
+import ssl
+
+# Ways to reach a domain, in the default order of preference
+VARIANTS = ('https', 'https-www', 'http', 'http-www')
+
+
+def variant_url(domain, variant):
+    """URL of the home page of domain (host, optionally with a port) for a variant."""
+    scheme, _, www = variant.partition('-')
+    return f"{scheme}://{'www.' if www else ''}{domain}"
+
+
+def domain_variants(domain):
+    """The variants that apply to domain: no www. variants for IP addresses or www. hosts."""
+    host = domain.rsplit(':', 1)[0] if domain.count(':') == 1 else domain
+    if host.startswith('www.') or _is_ip_address(host.strip('[]')):
+        return [variant for variant in VARIANTS if not variant.endswith('-www')]
+    return list(VARIANTS)
+
+
+async def probe(url, timeout):
+    """Return True if a TCP connection (and TLS handshake for https) to url's host succeeds within timeout."""
+    scheme, _, rest = url.partition('://')
+    host, _, port = rest.partition(':')
+    tls = scheme == 'https'
+    context = None
+    if tls:
+        # Like Scrapy's downloader, do not verify certificates
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, int(port) if port else (443 if tls else 80), ssl=context), timeout)
+    except (OSError, asyncio.TimeoutError, ssl.SSLError):
+        return False
+    writer.close()
+    return True
+
+
+class ConnectionStrategy:
+    """
+    Picks how to reach each domain: https or http, with or without www.
+
+    The applicable variants are raced: the most successful one so far starts
+    first and each next one probe_delay seconds later, unless a connection was
+    made already; the first to connect within probe_timeout wins. Winners are
+    cached per domain and, with a path, saved with the success counts so later
+    runs reuse them.
+    """
+
+    def __init__(self, path=None, probe_timeout=3.0, probe_delay=0.25):
+        self.path = path
+        self.probe_timeout = probe_timeout
+        self.probe_delay = probe_delay
+        self.attempts = dict.fromkeys(VARIANTS, 0)
+        self.successes = dict.fromkeys(VARIANTS, 0)
+        self.winners = {}
+        self.forgotten = set()
+        self.saved = (dict(self.attempts), dict(self.successes))  # Counts as last loaded or saved
+        self.changed = False
+        if path:
+            self.load()
+
+    def order(self, variants=VARIANTS):
+        """variants, most successful first (Laplace smoothed; ties keep the default order)."""
+        def rate(variant):
+            return (self.successes[variant] + 1) / (self.attempts[variant] + 2)
+        return sorted(variants, key=lambda variant: (-rate(variant), VARIANTS.index(variant)))
+
+    def cached(self, domain):
+        variant = self.winners.get(domain)
+        return variant_url(domain, variant) if variant else None
+
+    def forget(self, domain):
+        if self.winners.pop(domain, None) is not None:
+            self.forgotten.add(domain)
+            self.changed = True
+
+    async def choose(self, domain):
+        """Return the URL to request domain's home page with, or None if no variant connected."""
+        url = self.cached(domain)
+        if url is not None:
+            return url
+        variant = await self.race(domain, self.order(domain_variants(domain)))
+        if variant is None:
+            return None
+        self.winners[domain] = variant
+        self.changed = True
+        return variant_url(domain, variant)
+
+    async def race(self, domain, variants):
+        tasks = {}
+        try:
+            for variant in variants:
+                tasks[asyncio.ensure_future(probe(variant_url(domain, variant), self.probe_timeout))] = variant
+                winner = await self._first_success(tasks, self.probe_delay)
+                if winner is not None:
+                    return winner
+            return await self._first_success(tasks, None)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _first_success(self, tasks, timeout):
+        """Wait up to timeout (None: until all are done) for a probe to succeed; record the finished ones."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            for task in list(tasks):
+                if task.done() and not task.cancelled():
+                    variant = tasks.pop(task)
+                    self.attempts[variant] += 1
+                    self.changed = True
+                    if task.result():
+                        self.successes[variant] += 1
+                        return variant
+            pending = [task for task in tasks if not task.done()]
+            remaining = None if deadline is None else deadline - loop.time()
+            if not pending or (remaining is not None and remaining <= 0):
+                return None
+            await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+    def load(self):
+        state = self._read()
+        for variant in VARIANTS:
+            self.attempts[variant] = int(state.get('attempts', {}).get(variant, 0))
+            self.successes[variant] = int(state.get('successes', {}).get(variant, 0))
+        self.winners.update((domain, variant) for domain, variant in state.get('winners', {}).items()
+                            if variant in VARIANTS)
+        self.saved = (dict(self.attempts), dict(self.successes))
+
+    def save(self):
+        """
+        Write the winners and success counts; a no-op without a path or changes.
+
+        Sharded crawl workers share the file, so what another worker saved since
+        this one loaded it is merged in rather than overwritten.
+        """
+        if not self.path or not self.changed:
+            return
+        state = self._read()
+        saved_attempts, saved_successes = self.saved
+        for variant in VARIANTS:
+            self.attempts[variant] += int(state.get('attempts', {}).get(variant, 0)) - saved_attempts[variant]
+            self.successes[variant] += int(state.get('successes', {}).get(variant, 0)) - saved_successes[variant]
+        winners = {domain: variant for domain, variant in state.get('winners', {}).items()
+                   if variant in VARIANTS and domain not in self.forgotten}
+        winners.update(self.winners)
+        self.winners = winners
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'attempts': self.attempts, 'successes': self.successes, 'winners': self.winners}, f)
+        os.replace(tmp_path, self.path)
+        self.saved = (dict(self.attempts), dict(self.successes))
+        self.forgotten.clear()
+        self.changed = False
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+_connection_strategies = {}
+
+
+def get_connection_strategy(settings):
+    """Return the process-wide ConnectionStrategy for the settings' CONNECTION_STRATEGY_PATH."""
+    path = settings.get('CONNECTION_STRATEGY_PATH')
+    if path not in _connection_strategies:
+        _connection_strategies[path] = ConnectionStrategy(path, settings.getfloat('CONNECTION_PROBE_TIMEOUT', 3.0),
+                                                          settings.getfloat('CONNECTION_PROBE_DELAY', 0.25))
+    return _connection_strategies[path]
@@ -0,0 +1,130 @@
+import re
+from collections import OrderedDict
+
+# NANP area codes for which every number with a valid exchange (first digit
+# 2-9) is a valid number of a single region according to the phonenumbers
+# metadata. Numbers from these area codes are resolved without a full parse;
+# area codes whose validity depends on the exchange are left to phonenumbers.
+_NANP_AREA_CODES = {
+    'US': '''
+    201 202 203 205 206 207 208 209 210 212 213 214 215 216 217 218 219 220 223 224
+    225 227 228 229 231 234 235 239 240 248 251 252 253 254 256 260 262 267 269 270
+    272 274 276 279 281 283 301 302 303 304 305 307 308 309 310 312 313 314 315 316
+    317 318 319 320 321 323 324 325 326 327 329 330 331 332 334 336 337 339 341 346
+    347 350 351 352 353 360 361 363 364 369 380 385 386 401 402 404 405 406 407 408
+    409 410 412 413 414 415 417 419 423 424 425 430 432 434 435 440 442 443 445 447
+    448 458 463 464 469 470 472 475 478 479 480 484 500 501 502 503 504 505 507 508
+    509 510 512 513 515 516 517 518 520 521 522 525 526 527 528 529 530 531 532 533
+    534 539 540 541 544 551 557 559 561 562 563 564 566 567 570 571 572 573 574 575
+    577 580 582 585 586 588 601 602 603 605 606 607 608 609 610 612 614 615 616 617
+    618 619 620 623 626 628 629 630 631 636 640 641 645 646 650 651 656 657 659 660
+    661 662 667 669 678 680 681 682 686 689 701 702 703 704 706 707 708 712 713 714
+    715 716 717 718 719 720 724 725 726 727 728 730 731 732 734 737 738 740 743 747
+    748 754 757 760 762 763 765 769 770 771 772 773 774 775 779 781 785 786 800 801
+    802 803 804 805 806 808 810 812 813 814 815 816 817 818 820 821 826 828 830 831
+    832 833 835 838 839 840 843 844 845 847 848 850 854 855 856 857 858 859 860 862
+    863 864 865 866 870 872 877 878 888 900 901 903 904 906 907 908 909 910 912 913
+    914 915 916 917 918 919 920 925 928 929 930 931 934 936 937 938 940 941 943 945
+    947 948 949 951 952 954 956 959 970 971 972 973 975 978 979 980 984 985 986 989
+    ''',
+    'CA': '''
+    204 226 236 249 250 257 263 273 289 306 343 354 365 367 368 382 403 416 418 428
+    431 437 438 450 468 474 506 514 519 548 579 581 584 587 600 604 613 622 633 639
+    647 672 683 705 709 742 753 778 780 782 807 819 825 867 873 879 902 905 942
+    ''',
+    'PR': '''
+    787 939
+    ''',
+    'DO': '''
+    809 829 849
+    ''',
+    'JM': '''
+    658
+    ''',
+}
+
+NANP_AREA_CODE_REGIONS = {
+    area_code: region
+    for region, area_codes in _NANP_AREA_CODES.items()
+    for area_code in area_codes.split()
+}
+
+_NANP_NUMBER = re.compile(r'\+?1?([2-9]\d{2})([2-9])\d{6}')
+
+
+class CountryResolver:
+    """
+    Resolve formatted phone numbers to region codes, caching the results.
+
+    NANP numbers from area codes in NANP_AREA_CODE_REGIONS are resolved from the
+    table; everything else goes through phonenumbers.parse, is_valid_number and
+    region_code_for_number, exactly as before. Results, including numbers with no
+    region, are kept in a bounded LRU cache.
+    """
+
+    def __init__(self, default_region="US", cache_size=65536):
+        self.default_region = default_region
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.fast_path_hits = 0
+        self._cache = OrderedDict()
+
+    def resolve(self, phone_number):
+        try:
+            region = self._cache[phone_number]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(phone_number)
+            return region
+
+        region = self._resolve_nanp(phone_number)
+        if region is None:
+            region = self._parse(phone_number)
+        else:
+            self.fast_path_hits += 1
+
+        self._cache[phone_number] = region
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return region
+
+    def get_stats(self):
+        return {
+            'country_resolver/cache_hits': self.hits,
+            'country_resolver/cache_misses': self.misses,
+            'country_resolver/fast_path_hits': self.fast_path_hits,
+        }
+
+    def _resolve_nanp(self, phone_number):
+        match = _NANP_NUMBER.fullmatch(phone_number)
+        if match is None:
+            return None
+        # A leading + must be followed by the country code 1
+        if phone_number.startswith('+') and len(phone_number) != 12:
+            return None
+        return NANP_AREA_CODE_REGIONS.get(match.group(1))
+
+    def _parse(self, phone_number):
+        import phonenumbers
+
+        try:
+            parsed_number = phonenumbers.parse(phone_number, self.default_region)
+            if phonenumbers.is_valid_number(parsed_number):
+                return phonenumbers.region_code_for_number(parsed_number)
+        except phonenumbers.NumberParseException:
+            pass
+        return None
+
+
+_country_resolver = None
+
+
+def get_country_resolver():
+    """Return the process-wide CountryResolver."""
+    global _country_resolver
+    if _country_resolver is None:
+        _country_resolver = CountryResolver()
+    return _country_resolver
@@ -0,0 +1,60 @@
+# Define here your duplicate request filters
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/settings.html#dupefilter-class
+
+import logging
+
+from scrapy.dupefilters import BaseDupeFilter
+
+from phoneScrapper.urls import UrlFingerprintSet
+
+logger = logging.getLogger(__name__)
+
+
+class CanonicalUrlDupeFilter(BaseDupeFilter):
+    """
+    Drop requests for pages that were already scheduled, before they are downloaded.
+
+    GET requests are compared by canonical URL (see phoneScrapper.urls), so
+    tracking-parameter and fragment variants of a page are fetched once; other
+    methods are never filtered. Redirect hops are recorded but never filtered:
+    a redirect often points to the canonical form of the URL that caused it
+    (e.g. without its utm_ parameters), and RedirectMiddleware already bounds
+    redirect chains. Seen requests are kept in a Bloom filter of
+    DUPEFILTER_CAPACITY entries instead of a set of fingerprints.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.0001, debug=False, stats=None):
+        self.fingerprints = UrlFingerprintSet(capacity, error_rate)
+        self.debug = debug
+        self.stats = stats
+        self.log_duplicates = True
+        self.warned_capacity = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(capacity=settings.getint('DUPEFILTER_CAPACITY', 1000000),
+                   error_rate=settings.getfloat('DUPEFILTER_ERROR_RATE', 0.0001),
+                   debug=settings.getbool('DUPEFILTER_DEBUG'),
+                   stats=crawler.stats)
+
+    def request_seen(self, request):
+        if request.method != 'GET':
+            return False
+        new = self.fingerprints.add(request.url)
+        if new and self.fingerprints.over_capacity and not self.warned_capacity:
+            self.warned_capacity = True
+            logger.warning(f"More than {self.fingerprints.capacity} URLs seen, duplicate detection "
+                           f"will report more false positives; raise DUPEFILTER_CAPACITY")
+        if request.meta.get('redirect_times'):
+            return False
+        return not new
+
+    def log(self, request, spider):
+        if self.debug or self.log_duplicates:
+            spider.logger.debug(f"Filtered duplicate request: {request.url}")
+            self.log_duplicates = self.debug
+        if self.stats is not None:
+            self.stats.inc_value('dupefilter/filtered', spider=spider)
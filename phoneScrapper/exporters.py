@@ -1,32 +1,45 @@
 # myproject/exporters.py
+from itemadapter import ItemAdapter
 from scrapy.exporters import CsvItemExporter
 
+from phoneScrapper.items import result_fields
+
+
 class CustomCsvItemExporter(CsvItemExporter):
-    def __init__(self, *args, **kwargs):
-        delimiter = kwargs.pop('delimiter', ',')
-        kwargs['delimiter'] = delimiter
-        super(CustomCsvItemExporter, self).__init__(*args, **kwargs)
-        self.fields_to_export = ['url', 'phone_number1', 'phone_number2', 'phone_number3']
-        self.first_item = True  # Flag to handle header writing on first item
+    """
+    CSV exporter for PhoneScrapperItem: the url, then phone_number_N and country_N
+    for each of numbers_per_domain numbers.
+
+    The column order is fixed up front (unless the feed sets its own fields), so
+    items are turned into rows with plain lookups instead of Scrapy's per-field
+    serialization. Rows are written chunk_size at a time and on finish.
+    """
+
+    def __init__(self, file, numbers_per_domain=3, chunk_size=500, **kwargs):
+        if not kwargs.get('fields_to_export'):
+            kwargs['fields_to_export'] = list(result_fields(numbers_per_domain))
+        super(CustomCsvItemExporter, self).__init__(file, **kwargs)
+        self.numbers_per_domain = numbers_per_domain
+        self.chunk_size = chunk_size
+        # fields_to_export may map field names to column headers
+        self.fields = list(self.fields_to_export)
+        self.rows = []
 
     def export_item(self, item):
-        phone_numbers = item.get('phone_numbers', [])
-        
-        # Prepare item for export
-        itemdict = dict(self._get_serialized_fields(item, default_value=''))
-        
-        # Populate phone number fields
-        for i in range(3):
-            col_name = f'phone_number{i+1}'
-            itemdict[col_name] = phone_numbers[i] if i < len(phone_numbers) else ''
-        
-        # Remove the original phone_numbers field
-        if 'phone_numbers' in itemdict:
-            del itemdict['phone_numbers']
-
-        if self.first_item:
-            # Write headers dynamically on the first item
-            self.csv_writer.writerow(self.fields_to_export)
-            self.first_item = False
-
-        self.csv_writer.writerow([itemdict.get(key, '') for key in self.fields_to_export])
+        if self._headers_not_written:
+            self._headers_not_written = False
+            self._write_headers_and_set_fields_to_export(item)
+
+        adapter = ItemAdapter(item)
+        self.rows.append([adapter.get(field) or '' for field in self.fields])
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            rows, self.rows = self.rows, []
+            self.csv_writer.writerows(rows)
+
+    def finish_exporting(self):
+        self.flush()
+        super(CustomCsvItemExporter, self).finish_exporting()
@@ -0,0 +1,102 @@
+# Define here your extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+
+class PauseControl:
+    """
+    Pause and resume the crawl engine from the spider's pause_event.
+
+    The event (a multiprocessing.Event set by the GUI) is polled from the reactor
+    with a LoopingCall, so nothing ever sleeps in the reactor thread. While the
+    event is set the engine stops pulling new requests; downloads already in
+    flight finish normally and their responses are still parsed, so no state
+    is lost. Clearing the event unpauses the engine and schedules it right away.
+    """
+
+    def __init__(self, crawler, interval):
+        self.crawler = crawler
+        self.interval = interval
+        self.pause_event = None
+        self.paused = False
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        extension = cls(crawler, crawler.settings.getfloat('PAUSE_POLL_INTERVAL', 0.5))
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_opened(self, spider):
+        self.pause_event = getattr(spider, 'pause_event', None)
+        if self.pause_event is None:
+            return
+        self.task = task.LoopingCall(self.poll, spider)
+        self.task.start(self.interval, now=True)
+
+    def spider_closed(self, spider):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+
+    def poll(self, spider):
+        paused = self.pause_event.is_set()
+        if paused == self.paused:
+            return
+        self.paused = paused
+
+        engine = self.crawler.engine
+        if paused:
+            spider.logger.info("Pausing crawl")
+            engine.pause()
+        else:
+            spider.logger.info("Resuming crawl")
+            engine.unpause()
+            # Don't wait for the engine heartbeat to pick up pending requests again
+            slot = getattr(engine, '_slot', None) or getattr(engine, 'slot', None)
+            if slot is not None:
+                slot.nextcall.schedule()
+
+
+class CheckpointControl:
+    """
+    Flush the spider's crawl checkpoint periodically and close it with the crawl.
+
+    Enabled by CHECKPOINT_DIR; the spider opens the checkpoint (see
+    phoneScrapper.checkpoint) and records results in memory, and this extension
+    writes them to disk every CHECKPOINT_INTERVAL seconds. A crawl that finishes
+    normally removes its checkpoint; a stopped or interrupted one leaves it to be
+    resumed.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.checkpoint = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.get('CHECKPOINT_DIR'):
+            raise NotConfigured
+        extension = cls(crawler.settings.getfloat('CHECKPOINT_INTERVAL', 30))
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_opened(self, spider):
+        self.checkpoint = getattr(spider, 'checkpoint', None)
+        if self.checkpoint is None:
+            return
+        self.task = task.LoopingCall(self.checkpoint.flush)
+        self.task.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        if self.checkpoint is not None:
+            self.checkpoint.close(finished=reason == 'finished')
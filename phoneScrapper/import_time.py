@@ -0,0 +1,84 @@
+"""
+Measure how long the GUI takes to import and make sure it does not load the crawl stack.
+
+    python -m phoneScrapper.import_time [--module app] [--budget MS] [--repeat N] [--top N]
+
+Runs `python -X importtime -c "import app"` in fresh interpreters, from the project
+directory, and reports the best import time and the slowest imports it triggers.
+Exits with 1 if the module pulls in any of HEAVY_MODULES at import time (they belong
+in the crawl processes) or, with --budget, if it takes longer than the budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Imported when a crawl starts, never when the window opens
+HEAVY_MODULES = ('scrapy', 'twisted', 'phonenumbers', 'openpyxl', 'pandas', 'pyarrow')
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(output):
+    """Return [(module, cumulative microseconds, nesting level)] from -X importtime output."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue  # The header line
+        level = (len(name) - len(name.lstrip()) + 1) // 2  # 1 for top-level imports
+        imports.append((name.strip(), int(cumulative), level))
+    return imports
+
+
+def measure(module, cwd=PROJECT_DIR):
+    """
+    Import module in a fresh interpreter; return (its cumulative microseconds, records of
+    the imports it triggered).
+
+    Records are printed children first, so the imports of module are those between the
+    previous top-level record and its own. Interpreter startup imports are left out.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    imports = parse_importtime(result.stderr)
+    end = max(i for i, (name, _, level) in enumerate(imports) if name == module and level == 1)
+    start = max((i for i, (_, _, level) in enumerate(imports[:end]) if level == 1), default=-1) + 1
+    return imports[end][1], imports[start:end]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m phoneScrapper.import_time',
+                                     description="Check the import time of the GUI module.")
+    parser.add_argument('--module', default='app', help="module to import")
+    parser.add_argument('--budget', type=float, help="fail if the import takes longer than this many milliseconds")
+    parser.add_argument('--repeat', type=int, default=3, help="runs to take the best of")
+    parser.add_argument('--top', type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(max(args.repeat, 1))]
+    total_us, imports = min(runs, key=lambda run: run[0])
+    total_ms = total_us / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (best of {len(runs)})")
+    for name, us, _ in sorted((i for i in imports if i[2] == 2), key=lambda i: -i[1])[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    loaded = {name.split('.')[0] for name, _, _ in imports}
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    status = 0
+    if heavy:
+        print(f"FAIL: {args.module} imports {', '.join(heavy)} at startup")
+        status = 1
+    if args.budget is not None and total_ms > args.budget:
+        print(f"FAIL: {total_ms:.0f} ms is over the {args.budget:.0f} ms budget")
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
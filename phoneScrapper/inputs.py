@@ -0,0 +1,108 @@
+import csv
+import io
+import os
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def normalize_domain(value):
+    """
+    Return the host name to crawl for one input cell, or None if it holds no domain.
+
+    Accepts bare domains as well as pasted URLs: the scheme, path and surrounding
+    whitespace are dropped and the result is lowercased. Cells without a dot, such
+    as an empty cell or a "Domain" header, are skipped.
+    """
+    if value is None:
+        return None
+    domain = str(value).strip().lower()
+    if '://' in domain:
+        domain = domain.split('://', 1)[1]
+    domain = domain.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0].rstrip('.')
+    if '.' not in domain or ' ' in domain:
+        return None
+    return domain
+
+
+def unique_domains(values):
+    """Normalize values lazily, yielding each domain the first time it appears."""
+    seen = set()
+    for value in values:
+        domain = normalize_domain(value)
+        if domain is not None and domain not in seen:
+            seen.add(domain)
+            yield domain
+
+
+def _iter_excel_cells(path):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(min_col=1, max_col=1, values_only=True):
+            if row:
+                yield row[0]
+    finally:
+        workbook.close()
+
+
+def _iter_csv_cells(path):
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        for row in csv.reader(f):
+            if row:
+                yield row[0]
+
+
+def _iter_text_cells(path):
+    with open(path, encoding='utf-8-sig', errors='replace') as f:
+        yield from f
+
+
+def iter_domain_cells(path):
+    """Yield the raw first-column values of a .xlsx, .csv or plain text file, one row at a time."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        return _iter_excel_cells(path)
+    if extension == '.csv':
+        return _iter_csv_cells(path)
+    return _iter_text_cells(path)
+
+
+def iter_domains(path):
+    """
+    Stream the domains listed in the first column of path, normalized and deduplicated.
+
+    Nothing is read before the first domain is requested, and only one row is held
+    in memory at a time (plus the set of domains already yielded).
+    """
+    return unique_domains(iter_domain_cells(path))
+
+
+def count_domains(path):
+    """
+    Cheaply count the rows of a domain file, for progress reporting.
+
+    This is an upper bound of what iter_domains yields: blank rows, headers and
+    duplicates are included. Excel files report the sheet dimensions without
+    reading the cells; text files are scanned for line breaks in binary chunks.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            sheet = workbook.active
+            if sheet.max_row is not None:
+                return sheet.max_row
+        finally:
+            workbook.close()
+        return sum(1 for _ in _iter_excel_cells(path))
+
+    rows = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(io.DEFAULT_BUFFER_SIZE * 64), b''):
+            rows += chunk.count(b'\n')
+            last = chunk[-1:]
+    return rows + (last != b'\n')
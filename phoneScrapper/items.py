@@ -15,4 +15,14 @@ class PhoneScrapperItem(scrapy.Item):
     country_2 = scrapy.Field()
     phone_number_3 = scrapy.Field()
     country_3 = scrapy.Field()
+    # False for an early, provisional record of the domain (see phoneScrapper.aggregation)
+    final = scrapy.Field()
+
+
+def result_fields(numbers_per_domain=3):
+    """Column order of exported results: the url, then each phone number followed by its country."""
+    fields = ['url']
+    for i in range(1, numbers_per_domain + 1):
+        fields += [f'phone_number_{i}', f'country_{i}']
+    return tuple(fields)
 
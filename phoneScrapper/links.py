@@ -0,0 +1,54 @@
+import re
+from urllib.parse import urljoin, urlsplit
+
+from phoneScrapper.urls import canonicalize_url
+
+# Link keywords by how likely the page is to list a phone number, best first.
+# A link gets the priority of the best keyword it contains.
+LINK_PRIORITIES = (
+    (100, ('contact',)),
+    (80, ('support', 'call', 'help')),
+    (60, ('about',)),
+    (40, ('location',)),
+    (20, ('service', 'quote', 'store', 'legal', 'blog')),
+)
+
+_KEYWORD_PRIORITY = {keyword: priority for priority, keywords in LINK_PRIORITIES for keyword in keywords}
+_KEYWORDS = re.compile('|'.join(sorted(_KEYWORD_PRIORITY, key=len, reverse=True)), re.IGNORECASE)
+
+
+def score_link(link):
+    """Return the priority of link, or 0 if it contains none of the keywords."""
+    return max((_KEYWORD_PRIORITY[match.group().lower()] for match in _KEYWORDS.finditer(link)), default=0)
+
+
+class LinkFrontier:
+    """
+    Choose which links of a home page to follow, and in which order.
+
+    Links are scored with score_link, resolved against the page URL, deduplicated
+    by canonical URL and ranked best first (document order within the same score).
+    At most max_links are returned, as (priority, url) pairs ready to be used as
+    Scrapy request priorities.
+    """
+
+    def __init__(self, max_links=10):
+        self.max_links = max_links
+
+    def select(self, base_url, links, accept=None):
+        candidates = {}
+        for link in links:
+            priority = score_link(link)
+            if not priority:
+                continue
+            url = urljoin(base_url, link.strip())
+            if urlsplit(url).scheme not in ('http', 'https'):
+                continue
+            if accept is not None and not accept(url):
+                continue
+            key = canonicalize_url(url)
+            if key not in candidates or candidates[key][0] < priority:
+                candidates[key] = (priority, url)
+
+        ranked = sorted(candidates.values(), key=lambda candidate: -candidate[0])
+        return ranked[:self.max_links]
@@ -3,7 +3,15 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from collections import deque
+from urllib.parse import urlsplit
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.utils.reactor import is_asyncio_reactor_installed
+
+from phoneScrapper.connections import get_connection_strategy
+from phoneScrapper.resolver import get_domain_resolver
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
@@ -101,3 +109,146 @@ class PhonescrapperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class DomainCompletionMiddleware:
+    # Drops the queued requests of domains the spider already found enough
+    # phone numbers for, and ignores their responses that were still in
+    # flight before they reach the spider.
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_request(self, request, spider):
+        if self._is_satisfied(request, spider):
+            self.stats.inc_value('domain_completion/dropped_requests', spider=spider)
+            raise IgnoreRequest(f"Domain already satisfied: {request.meta['parent_url']}")
+        return None
+
+    def process_response(self, request, response, spider):
+        if self._is_satisfied(request, spider):
+            self.stats.inc_value('domain_completion/ignored_responses', spider=spider)
+            raise IgnoreRequest(f"Domain already satisfied: {request.meta['parent_url']}")
+        return response
+
+    def _is_satisfied(self, request, spider):
+        tracker = getattr(spider, 'domain_tracker', None)
+        parent_url = request.meta.get('parent_url')
+        return tracker is not None and parent_url is not None and tracker.is_satisfied(parent_url)
+
+
+def _dns_prefilter_enabled(settings):
+    if not settings.getbool('DNS_PREFILTER_ENABLED'):
+        return False
+    if not is_asyncio_reactor_installed():
+        return False  # The resolver runs on the asyncio event loop
+    return True
+
+
+class DnsPrefetchMiddleware:
+    # Spider middleware: reads DNS_PREFILTER_LOOKAHEAD start requests ahead of the
+    # engine and starts resolving their hosts, so DnsPrefilterMiddleware finds most
+    # answers ready instead of resolving one domain at a time. The spider starts
+    # tracking a domain only once its request is scheduled, so requests still
+    # buffered here when the crawl stops leave no trace.
+
+    def __init__(self, resolver, lookahead):
+        self.resolver = resolver
+        self.lookahead = lookahead
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not _dns_prefilter_enabled(crawler.settings):
+            raise NotConfigured
+        return cls(get_domain_resolver(crawler.settings), crawler.settings.getint('DNS_PREFILTER_LOOKAHEAD', 500))
+
+    def process_start_requests(self, start_requests, spider):
+        ahead = deque()
+        for request in start_requests:
+            self.resolver.prefetch(urlsplit(request.url).hostname)
+            ahead.append(request)
+            if len(ahead) > self.lookahead:
+                yield ahead.popleft()
+        yield from ahead
+
+
+class DnsPrefilterMiddleware:
+    # Resolves the host of each domain's first request before it is downloaded and
+    # drops the domains whose name does not exist, which would otherwise wait for
+    # the download and its retries to fail. The request is scheduled but never
+    # downloaded; the reason is logged and counted in the dns_prefilter/dropped/
+    # stats, and the domain still gets its (empty) record from the errback.
+
+    def __init__(self, resolver, stats):
+        self.resolver = resolver
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not _dns_prefilter_enabled(crawler.settings):
+            raise NotConfigured
+        middleware = cls(get_domain_resolver(crawler.settings), crawler.stats)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    async def process_request(self, request, spider):
+        host = urlsplit(request.url).hostname
+        if not request.meta.get('is_parent') or not host:
+            return None
+        result = await self.resolver.resolve(host)
+        if result.alive:
+            return None
+        self.stats.inc_value(f'dns_prefilter/dropped/{result.reason}', spider=spider)
+        spider.logger.info(f"Dropping {request.url}: {result.reason}")
+        raise IgnoreRequest(f"DNS prefilter: {host} ({result.reason})")
+
+    def spider_closed(self, spider):
+        for key, value in self.resolver.get_stats().items():
+            self.stats.set_value(f'dns_prefilter/{key}', value, spider=spider)
+
+
+class ConnectionStrategyMiddleware:
+    # Sends each domain's first request to the scheme and host variant that
+    # connects (https or http, with or without www., see phoneScrapper.connections)
+    # instead of always https://domain. The request keeps its parent_url, so
+    # results are still keyed by the domain. Winners are saved when the spider
+    # closes and reused by later runs; a domain whose request then fails is raced
+    # again next time.
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('CONNECTION_STRATEGY_ENABLED') or not is_asyncio_reactor_installed():
+            raise NotConfigured
+        middleware = cls(get_connection_strategy(crawler.settings))
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    async def process_request(self, request, spider):
+        if not request.meta.get('is_parent') or 'connection_variant' in request.meta:
+            return None
+        url = await self.strategy.choose(self._domain(request))
+        if url is None or url == request.url:
+            return None  # Nothing connected; the download reports why
+        spider.logger.debug(f"Requesting {request.meta.get('parent_url')} as {url}")
+        return request.replace(url=url, dont_filter=True, meta={**request.meta, 'connection_variant': url})
+
+    def process_exception(self, request, exception, spider):
+        if request.meta.get('is_parent'):
+            self.strategy.forget(self._domain(request))
+        return None
+
+    def spider_closed(self, spider):
+        try:
+            self.strategy.save()
+        except OSError as e:
+            spider.logger.warning(f"Could not save the connection variants: {e}")
+
+    def _domain(self, request):
+        return urlsplit(request.meta.get('parent_url') or request.url).netloc
@@ -0,0 +1,55 @@
+import re
+import weakref
+from functools import cached_property
+
+from phoneScrapper.text_nodes import TextIndex
+
+# Analyses live exactly as long as the response they were computed for
+_analyses = weakref.WeakKeyDictionary()
+
+
+class PageAnalysis:
+    """
+    Per-response view of the parts of a page the spider looks at.
+
+    Every attribute is computed on first access and then reused, so the DOM is
+    walked once per response no matter how many extractors read from it. Use
+    PageAnalysis.for_response() to get the instance cached for a response.
+    """
+
+    zip_pattern = re.compile(r'\b\d{5}\b')
+
+    def __init__(self, response):
+        self.root = response.selector.root
+
+    @classmethod
+    def for_response(cls, response):
+        analysis = _analyses.get(response)
+        if analysis is None:
+            analysis = _analyses[response] = cls(response)
+        return analysis
+
+    @cached_property
+    def text_index(self):
+        return TextIndex(self.root)
+
+    @cached_property
+    def text_blocks(self):
+        """List of (text, owning element, offset in text_index) for every text node inside a container tag."""
+        return self.text_index.blocks
+
+    @cached_property
+    def links(self):
+        """The href of every <a> element, in document order."""
+        return [href for href in (anchor.get('href') for anchor in self.root.iter('a')) if href is not None]
+
+    @cached_property
+    def tel_hrefs(self):
+        return [href for href in self.links if href.startswith('tel:')]
+
+    @cached_property
+    def zip_codes(self):
+        zip_codes = set()
+        for text, _, _ in self.text_blocks:
+            zip_codes.update(self.zip_pattern.findall(text))
+        return zip_codes
@@ -0,0 +1,77 @@
+import re
+from functools import lru_cache
+
+# Phone number patterns, highest priority first. Every pattern is matched on its
+# own, so overlapping matches of different patterns are all found, and numbers
+# are reported pattern by pattern in this order.
+PRIORITIZED_PATTERNS = (
+    r'\(\d{3}\)\s?\d{3}[-\s]?\d{4}',
+    r'\d{3}[\s-]\d{3}[-\s]\d{4}',
+    r'\(\d{3}\)\d{3}[-\s]?\d{4}',
+    r'\(\d{3}\)[-\s]?\d{3}[-\s]?\d{4}',
+    r'\d{3}[.]\d{3}[.]\d{4}',
+    r'\d{3}-\d{3}-\d{4}',
+    r'\+\d{1}[\s]?\d{10}',
+    r'\+\d{1}[\s]?\d{3}[.]\d{3}[.]\d{4}',
+    r'\+\d{1}[\s]?\d{3}[-]\d{3}[-]\d{4}',
+    r'1-\d{3}-\d{3}-\d{4}',
+    r'\d{10}',
+    r'1\s?\d{10}',
+    r'1\s?\d{3}[.]\d{3}[.]\d{4}',
+    r'1\s?\d{3}[-]\d{3}[-]\d{4}',
+    r'1\(\d{3}\)\d{7}',
+    r'1\(\d{3}\)[-]\d{3}[-]\d{4}',
+    r'\+\d{1}[\s]?\d{3}[-\s]\d{3}[-\s]\d{4}',
+    r'\+\d{1}[\s]?\d{3}[-]\d{3}[-][A-Z]{4}',
+    r'\d{3}[-]\d{3}[-][A-Z]{4}',
+    r'\d{3}[.]\d{3}[.][A-Z]{4}',
+    r'\(\d{3}\)[-]\d{3}[-][A-Z]{4}',
+    r'\(\d{3}\)\d{3}[-][A-Z]{4}',
+    r'\d{3}\s\d{3}\s[A-Z]{3}',
+    r'\d{3}\s\d{3}[-][A-Z]{4}',
+    r'\(\d{3}\)\s\d{3}[-][A-Z]{4}',
+    r'1-\d{3}-\d{3}-[A-Z]{4}',
+    r'1\s\d{3}[.]\d{3}[.][A-Z]{4}',
+    r'1\s\d{3}[-]\d{3}[-][A-Z]{4}',
+)
+
+# Every pattern above needs at least three consecutive digits, so text
+# without them can be skipped before running the full alternation.
+_DIGIT_RUN = re.compile(r'\d{3}')
+
+
+class PhonePatternEngine:
+    """
+    Scan text for phone numbers with the prioritized patterns, compiled once.
+
+    Matches are the same, in the same order, as running findall with each pattern
+    in priority order. Most text blocks hold no number, so the patterns are also
+    compiled into one alternation that rejects those in a single scan; only text
+    it matches is scanned pattern by pattern.
+    """
+
+    def __init__(self, patterns=PRIORITIZED_PATTERNS):
+        self.patterns = tuple(patterns)
+        self.regexes = [re.compile(pattern) for pattern in self.patterns]
+        self.regex = re.compile('|'.join(f'(?:{pattern})' for pattern in self.patterns))
+
+    def finditer(self, text):
+        if not text or not _DIGIT_RUN.search(text) or not self.regex.search(text):
+            return
+        for regex in self.regexes:
+            yield from regex.finditer(text)
+
+    def findall(self, text):
+        return [match.group() for match in self.finditer(text)]
+
+
+def get_phone_pattern_engine(patterns=PRIORITIZED_PATTERNS):
+    """
+    Return the process-wide engine for the given pattern set, compiling it on first use.
+    """
+    return _cached_engine(tuple(patterns))
+
+
+@lru_cache(maxsize=None)
+def _cached_engine(patterns):
+    return PhonePatternEngine(patterns)
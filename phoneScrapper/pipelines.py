@@ -6,8 +6,60 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+from phoneScrapper.sinks import open_result_sink
 
 
 class PhonescrapperPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class ResultSinkPipeline:
+    """
+    Append every scraped item to the results file RESULT_SINK_PATH (.csv, .jsonl or .parquet).
+
+    Rows are written every RESULT_SINK_BUFFER_SIZE items and at least every
+    RESULT_SINK_FLUSH_INTERVAL seconds, so results are on disk while the crawl
+    runs instead of only when the user exports them. With RESULT_SINK_APPEND the
+    file is extended, as when resuming a crawl, instead of replaced.
+    """
+
+    def __init__(self, path, buffer_size=100, flush_interval=5.0, append=False):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.append = append
+        self.sink = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get('RESULT_SINK_PATH')
+        if not path:
+            raise NotConfigured
+        return cls(path,
+                   buffer_size=settings.getint('RESULT_SINK_BUFFER_SIZE', 100),
+                   flush_interval=settings.getfloat('RESULT_SINK_FLUSH_INTERVAL', 5.0),
+                   append=settings.getbool('RESULT_SINK_APPEND'))
+
+    def open_spider(self, spider):
+        self.sink = open_result_sink(self.path, buffer_size=self.buffer_size, append=self.append)
+        self.task = task.LoopingCall(self.sink.flush)
+        self.task.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        self.sink.close()
+        spider.logger.info(f"Wrote {self.sink.rows_written} results to {self.path}")
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        # Provisional records are superseded by the domain's final record
+        if adapter.get('final') is not False:
+            self.sink.write(adapter)
+        return item
@@ -0,0 +1,159 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# alive is False only when the name definitely has no address (reason says why);
+# timeouts and temporary failures leave the domain to the crawler
+DnsResult = namedtuple('DnsResult', 'host alive reason addresses')
+
+DEAD_REASONS = {
+    socket.EAI_NONAME: 'nxdomain',
+}
+if hasattr(socket, 'EAI_NODATA'):  # Not defined on Windows
+    DEAD_REASONS[socket.EAI_NODATA] = 'no_address'
+
+
+class SystemLookup:
+    """Look host names up with the system resolver (getaddrinfo) on a pool of max_workers threads."""
+
+    def __init__(self, max_workers=100):
+        self.max_workers = max_workers
+        self.executor = None
+
+    async def __call__(self, host):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='dns')
+        loop = asyncio.get_running_loop()
+        infos = await loop.run_in_executor(self.executor, socket.getaddrinfo, host, None, 0, socket.SOCK_STREAM)
+        return sorted({info[4][0] for info in infos})
+
+
+class StubLookup:
+    """
+    Canned answers instead of DNS, for tests: answers maps host names to a list of
+    addresses or to an exception to raise. Unknown names do not exist.
+    """
+
+    def __init__(self, answers=None, delay=0.0):
+        self.answers = dict(answers or {})
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, host):
+        self.calls.append(host)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        answer = self.answers.get(host)
+        if answer is None:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        if isinstance(answer, BaseException):
+            raise answer
+        return list(answer)
+
+
+class DomainResolver:
+    """
+    Resolve host names on the asyncio event loop, at most concurrency at a time.
+
+    Answers are cached for ttl seconds (up to cache_size names) and concurrent
+    lookups of the same name share one query, so prefetch() can start lookups
+    ahead of the requests that will await them with resolve().
+    """
+
+    def __init__(self, lookup=None, concurrency=100, timeout=5.0, ttl=3600, cache_size=100000):
+        self.lookup = lookup or SystemLookup(concurrency)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, host):
+        entry = self.cache.get(host)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self.cache[host]
+            return None
+        self.cache.move_to_end(host)
+        return result
+
+    def prefetch(self, host):
+        """Start looking host up in the background; must be called with the event loop running."""
+        if host and self.cached(host) is None and host not in self.pending:
+            self.pending[host] = asyncio.ensure_future(self._resolve(host))
+
+    async def resolve(self, host):
+        result = self.cached(host)
+        if result is not None:
+            self.hits += 1
+            return result
+        if host not in self.pending:
+            self.pending[host] = asyncio.ensure_future(self._resolve(host))
+        else:
+            self.hits += 1  # Shares a lookup already under way
+        return await asyncio.shield(self.pending[host])
+
+    async def _resolve(self, host):
+        try:
+            if _is_ip_address(host):
+                result = DnsResult(host, True, None, [host])
+            else:
+                self.misses += 1
+                async with self.semaphore:
+                    result = await self._lookup(host)
+            if result.reason not in ('timeout', 'error'):  # Transient failures are asked again next time
+                self.cache[host] = (time.monotonic() + self.ttl, result)
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            return result
+        finally:
+            self.pending.pop(host, None)
+
+    async def _lookup(self, host):
+        try:
+            addresses = await asyncio.wait_for(self.lookup(host), self.timeout)
+        except asyncio.TimeoutError:
+            return DnsResult(host, True, 'timeout', [])
+        except socket.gaierror as e:
+            reason = DEAD_REASONS.get(e.errno)
+            return DnsResult(host, reason is None, reason or 'error', [])
+        except OSError:
+            return DnsResult(host, True, 'error', [])
+        if not addresses:
+            return DnsResult(host, False, 'no_address', [])
+        return DnsResult(host, True, None, addresses)
+
+    def get_stats(self):
+        return {'dns_cache_hits': self.hits, 'dns_lookups': self.misses, 'dns_cache_size': len(self.cache)}
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+_domain_resolver = None
+
+
+def get_domain_resolver(settings=None):
+    """Return the process-wide DomainResolver, so warm workers keep its cache between crawls."""
+    global _domain_resolver
+    if _domain_resolver is None:
+        if settings is None:
+            _domain_resolver = DomainResolver()
+        else:
+            _domain_resolver = DomainResolver(concurrency=settings.getint('DNS_PREFILTER_CONCURRENCY', 100),
+                                              timeout=settings.getfloat('DNS_PREFILTER_TIMEOUT', 5.0),
+                                              ttl=settings.getint('DNS_PREFILTER_CACHE_TTL', 3600))
+    return _domain_resolver
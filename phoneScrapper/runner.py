@@ -0,0 +1,104 @@
+"""
+Run the phone scraper in worker processes, reporting items over a multiprocessing queue.
+
+Used by the headless command line (phoneScrapper.cli); the GUI keeps warm workers
+from phoneScrapper.worker instead. Nothing here imports Qt.
+"""
+import logging
+import sys
+from multiprocessing import Process
+
+from pydispatch import dispatcher
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from phoneScrapper.sharding import shard_path
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+from phoneScrapper.transport import ItemBatcher
+from phoneScrapper.zip_index import DEFAULT_ZIP_INDEX_PATH, load_zip_index
+
+logger = logging.getLogger(__name__)
+
+
+def crawl_settings(checkpoint_dir=None, resume=False, results_path=None, extra_settings=None, shard=0, shards=1):
+    """Project settings for one crawl, or for one shard of a crawl."""
+    settings = get_project_settings()
+    settings.setdict(extra_settings or {}, priority='cmdline')
+    if checkpoint_dir:
+        settings.set('CHECKPOINT_DIR', checkpoint_dir)  # Resumable crawl: skip finished domains if resume is set
+    if results_path:
+        settings.set('RESULT_SINK_PATH', results_path)  # Results are streamed here; a resumed crawl appends
+        settings.set('RESULT_SINK_APPEND', resume)
+        settings.set('FEEDS', {}, priority='cmdline')  # The results file replaces the feed
+    elif shards > 1:
+        # Each shard writes its own feed files instead of overwriting the others'
+        feeds = {shard_path(str(uri), shard, shards): options for uri, options in settings.getdict('FEEDS').items()}
+        settings.set('FEEDS', feeds, priority='cmdline')
+    return settings
+
+
+def run_spider(domains, item_queue, spider_closed_event, pause_event, domains_file=None, checkpoint_dir=None, resume=False,
+               results_path=None, shard=0, shards=1, extra_settings=None):
+    settings = crawl_settings(checkpoint_dir, resume, results_path, extra_settings, shard, shards)
+    process = CrawlerProcess(settings=settings)
+    batcher = ItemBatcher(item_queue, settings.getint('ITEM_BATCH_SIZE'), settings.getfloat('ITEM_BATCH_INTERVAL'))
+
+    class CustomPhoneScrapperSpider(PhoneScrapperSpider):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            dispatcher.connect(self.spider_opened_callback, signal=signals.spider_opened)
+            dispatcher.connect(self.item_scraped_callback, signal=signals.item_scraped)
+            dispatcher.connect(self.spider_closed_callback, signal=signals.spider_closed)
+            self.pause_event = pause_event
+
+        def spider_opened_callback(self, spider):
+            batcher.start()
+
+        def item_scraped_callback(self, item, response, spider):
+            batcher.add(dict(item))  # Queue scraped items in batches
+
+        def spider_closed_callback(self, spider):
+            batcher.close()  # Send the remaining items and the end-of-stream marker
+            spider_closed_event.set()  # Set the event to indicate the spider has closed
+
+    failures = []
+
+    def crawl_failed(failure):
+        # Also reached when the spider failed to open, which never sends spider_closed
+        failures.append(failure)
+        logger.error(f"Crawl failed: {failure.getTraceback()}")
+        batcher.close()
+
+    deferred = process.crawl(CustomPhoneScrapperSpider, domains=domains, domains_file=domains_file, resume=resume,
+                             shard=shard, shards=shards)
+    deferred.addErrback(crawl_failed)
+    process.start()
+    process.stop()
+    if failures:
+        sys.exit(1)
+
+
+def start_workers(item_queue, spider_closed_event, pause_event, domains=None, domains_file=None, workers=1,
+                  checkpoint_dir=None, resume=False, results_path=None, extra_settings=None):
+    """
+    Start workers run_spider processes, one per shard of the domains, and return them.
+
+    All workers share the item queue and the events; each puts its own END_OF_STREAM
+    on the queue when done. Checkpoints and results files are per shard.
+    """
+    if workers > 1:
+        load_zip_index(DEFAULT_ZIP_INDEX_PATH)  # Build the ZIP index once if needed, not in every worker
+
+    processes = []
+    for shard in range(workers):
+        process = Process(target=run_spider, args=(domains, item_queue, spider_closed_event, pause_event),
+                          kwargs={'domains_file': domains_file,
+                                  'checkpoint_dir': checkpoint_dir and shard_path(checkpoint_dir, shard, workers),
+                                  'resume': resume,
+                                  'results_path': results_path and shard_path(results_path, shard, workers),
+                                  'shard': shard, 'shards': workers,
+                                  'extra_settings': extra_settings})
+        process.start()
+        processes.append(process)
+    return processes
@@ -84,6 +84,10 @@ HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 #SPIDER_MIDDLEWARES = {
 #    "phoneScrapper.middlewares.PhonescrapperSpiderMiddleware": 543,
 #}
+# Start resolving the hosts of the next start requests ahead of their download
+SPIDER_MIDDLEWARES = {
+    "phoneScrapper.middlewares.DnsPrefetchMiddleware": 50,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
@@ -91,6 +95,12 @@ HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'scrapy_user_agents.middlewares.RandomUserAgentMiddleware': 400,
+    # Drop requests and responses of domains that already have enough phone numbers
+    'phoneScrapper.middlewares.DomainCompletionMiddleware': 100,
+    # Drop domains whose name does not resolve before requesting them
+    'phoneScrapper.middlewares.DnsPrefilterMiddleware': 40,
+    # Request each domain over the scheme/www. variant that connects
+    'phoneScrapper.middlewares.ConnectionStrategyMiddleware': 50,
 }
 
 # Enable or disable extensions
@@ -98,12 +108,23 @@ DOWNLOADER_MIDDLEWARES = {
 #EXTENSIONS = {
 #    "scrapy.extensions.telnet.TelnetConsole": None,
 #}
+# Pause and resume the engine from the spider's pause_event without blocking the reactor
+EXTENSIONS = {
+    "phoneScrapper.extensions.PauseControl": 500,
+    "phoneScrapper.extensions.CheckpointControl": 510,
+}
+PAUSE_POLL_INTERVAL = 0.5  # Seconds between checks of the pause event
+
+# Items are sent from the crawl process to the GUI in batches
+ITEM_BATCH_SIZE = 50  # Send a batch once this many items are buffered
+ITEM_BATCH_INTERVAL = 0.25  # Or at least this often (seconds) while items are pending
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "phoneScrapper.pipelines.PhonescrapperPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    # Stream results to RESULT_SINK_PATH as they are scraped
+    "phoneScrapper.pipelines.ResultSinkPipeline": 300,
+}
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -143,6 +164,8 @@ FEEDS = {
         'encoding': 'utf8',
         'store_empty': False,
         'overwrite': True,
+        # Phone number/country column pairs per row, and rows written per chunk
+        'item_export_kwargs': {'numbers_per_domain': 3, 'chunk_size': 500},
     },
 }
 
@@ -165,4 +188,62 @@ AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 5
 AUTOTHROTTLE_MAX_DELAY = 60
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
-AUTOTHROTTLE_DEBUG = False
\ No newline at end of file
+AUTOTHROTTLE_DEBUG = False
+
+# Phone number validation
+# Extra reject rules as (name, target, pattern, mode) tuples, see phoneScrapper.validation
+PHONE_VALIDATOR_RULES = []
+# Number of formatted numbers whose verdict is remembered
+PHONE_VALIDATOR_CACHE_SIZE = 4096
+
+# Most links followed from each home page, best ranked first (see phoneScrapper/links.py)
+MAX_LINKS_PER_DOMAIN = 10
+
+# Drop duplicate requests by canonical URL before they are downloaded, using a
+# Bloom filter sized for DUPEFILTER_CAPACITY URLs (about 2.4 MB per million)
+DUPEFILTER_CLASS = "phoneScrapper.dupefilters.CanonicalUrlDupeFilter"
+DUPEFILTER_CAPACITY = 1000000
+DUPEFILTER_ERROR_RATE = 0.0001
+
+# Directory of the resumable crawl checkpoint (unset disables checkpointing; the
+# GUI sets one per input file) and how often it is written, in seconds
+CHECKPOINT_DIR = None
+CHECKPOINT_INTERVAL = 30
+
+# Results file written while crawling (.csv, .jsonl or .parquet; unset disables it),
+# flushed every RESULT_SINK_BUFFER_SIZE items or RESULT_SINK_FLUSH_INTERVAL seconds.
+# RESULT_SINK_APPEND extends an existing file instead of replacing it.
+RESULT_SINK_PATH = None
+RESULT_SINK_BUFFER_SIZE = 100
+RESULT_SINK_FLUSH_INTERVAL = 5.0
+RESULT_SINK_APPEND = False
+
+# Also emit a provisional record (final=False) as soon as a domain has its first
+# numbers, before its one final record (see phoneScrapper/aggregation.py)
+EMIT_PROVISIONAL_RESULTS = False
+
+# Crawl processes the GUI starts for a domain file, each taking the domains whose
+# crc32 hash falls in its shard (0 means one per CPU core). Resume a checkpointed
+# crawl with the same number of workers.
+CRAWL_WORKERS = 1
+
+# Resolve each domain before its first request, DNS_PREFILTER_CONCURRENCY names at
+# a time and DNS_PREFILTER_LOOKAHEAD start requests ahead, and drop the ones that
+# do not exist (NXDOMAIN) instead of waiting for their downloads to fail. Lookups
+# taking longer than DNS_PREFILTER_TIMEOUT seconds let the domain through. Needs
+# the asyncio reactor (TWISTED_REACTOR above).
+DNS_PREFILTER_ENABLED = True
+DNS_PREFILTER_CONCURRENCY = 100
+DNS_PREFILTER_LOOKAHEAD = 500
+DNS_PREFILTER_TIMEOUT = 5.0
+DNS_PREFILTER_CACHE_TTL = 3600
+
+# Reach each domain over https or http, with or without www.: the variants are
+# raced, most successful first, each CONNECTION_PROBE_DELAY seconds after the
+# previous one, and the first to connect within CONNECTION_PROBE_TIMEOUT seconds
+# is requested. Winners and success counts are kept in CONNECTION_STRATEGY_PATH
+# for later runs. Needs the asyncio reactor.
+CONNECTION_STRATEGY_ENABLED = True
+CONNECTION_STRATEGY_PATH = 'connection_variants.json'
+CONNECTION_PROBE_TIMEOUT = 3.0
+CONNECTION_PROBE_DELAY = 0.25
@@ -0,0 +1,35 @@
+import os
+import zlib
+
+
+def shard_of(domain, shards):
+    """Shard (0 to shards - 1) a domain belongs to; stable across processes and runs."""
+    return zlib.crc32(domain.encode('utf-8')) % shards
+
+
+def iter_shard(domains, shard, shards):
+    """Yield the domains of one shard out of shards."""
+    if shards <= 1:
+        yield from domains
+        return
+    for domain in domains:
+        if shard_of(domain, shards) == shard:
+            yield domain
+
+
+def shard_path(path, shard, shards):
+    """
+    Per-shard variant of a file or directory path, e.g. results.shard-0-of-4.csv.
+
+    Each crawl worker writes its own checkpoint and results file, so workers never
+    share a file. A single worker keeps path unchanged.
+    """
+    if shards <= 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f'{root}.shard-{shard}-of-{shards}{extension}'
+
+
+def resolve_workers(workers):
+    """Number of crawl workers for a CRAWL_WORKERS value; 0 means one per CPU core."""
+    return workers if workers > 0 else os.cpu_count() or 1
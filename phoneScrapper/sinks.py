@@ -0,0 +1,216 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+
+from phoneScrapper.items import result_fields
+
+RESULT_FIELDS = result_fields()
+
+# Results of GUI crawls are written under this directory
+DEFAULT_RESULTS_ROOT = 'results'
+
+
+class ResultSink:
+    """
+    Append scraped items to a results file as the crawl goes.
+
+    Rows are buffered and written every buffer_size items and on flush(), so a
+    crash loses at most the unflushed rows. Subclasses implement _write_rows for
+    one file format; open_result_sink picks one from the file extension.
+    """
+
+    def __init__(self, path, fields=RESULT_FIELDS, buffer_size=100, append=False):
+        self.path = path
+        self.fields = tuple(fields)
+        self.buffer_size = buffer_size
+        self.append = append
+        self.buffer = []
+        self.rows_written = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, item):
+        self.buffer.append([item.get(field) or '' for field in self.fields])
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            rows, self.buffer = self.buffer, []
+            self._write_rows(rows)
+            self.rows_written += len(rows)
+
+    def close(self):
+        self.flush()
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+
+class CsvResultSink(ResultSink):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        new_file = not self.append or not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self.file = open(self.path, 'w' if new_file else 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(self.fields)
+            self.file.flush()
+
+    def _write_rows(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class JsonLinesResultSink(ResultSink):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.file = open(self.path, 'a' if self.append else 'w', encoding='utf-8')
+
+    def _write_rows(self, rows):
+        self.file.write(''.join(json.dumps(dict(zip(self.fields, row))) + '\n' for row in rows))
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Parquet sink, one row group per flush. Needs pyarrow.
+
+    Parquet files cannot be appended to and are only readable once closed, so
+    prefer CSV or JSON lines when the crawl may be interrupted; open_result_sink
+    refuses to resume into an existing one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        import pyarrow
+        import pyarrow.parquet
+
+        super().__init__(*args, **kwargs)
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([(field, pyarrow.string()) for field in self.fields])
+        self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+
+    def _write_rows(self, rows):
+        columns = [[str(row[i]) for row in rows] for i in range(len(self.fields))]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+SINK_CLASSES = {
+    '.csv': CsvResultSink,
+    '.jsonl': JsonLinesResultSink,
+    '.parquet': ParquetResultSink,
+}
+
+
+def open_result_sink(path, fields=RESULT_FIELDS, buffer_size=100, append=False):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINK_CLASSES:
+        raise ValueError(f"Unsupported results file type '{extension}', expected one of {', '.join(SINK_CLASSES)}")
+    if extension == '.parquet' and append and os.path.exists(path) and os.path.getsize(path):
+        # Writing it again would truncate the results of the interrupted run
+        raise ValueError(f"Cannot append to the Parquet results file {path}; use a .csv or .jsonl file to resume")
+    return SINK_CLASSES[extension](path, fields, buffer_size=buffer_size, append=append)
+
+
+def iter_result_rows(path):
+    """Yield the rows of a results file as lists of strings, header first."""
+    if not isinstance(path, str):
+        yield from _iter_concatenated_rows(path)
+        return
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.reader(f)
+    elif extension == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            fields = None
+            for line in f:
+                record = json.loads(line)
+                if fields is None:
+                    fields = list(record)
+                    yield fields
+                yield [record.get(field, '') for field in fields]
+    elif extension == '.parquet':
+        import pyarrow.parquet
+
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        yield parquet_file.schema_arrow.names
+        for batch in parquet_file.iter_batches():
+            yield from zip(*(column.to_pylist() for column in batch.columns))
+    else:
+        raise ValueError(f"Unsupported results file type '{extension}'")
+
+
+def _iter_concatenated_rows(paths):
+    # Results of a sharded crawl: one header, then the rows of every existing file
+    header_written = False
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        rows = iter_result_rows(path)
+        header = next(rows, None)
+        if header is not None and not header_written:
+            header_written = True
+            yield header
+        yield from rows
+
+
+def export_results(sink_path, output_path, headers=None, number_rows=False):
+    """
+    Write the results file sink_path to output_path (.csv or .xlsx), row by row.
+
+    sink_path may also be a list of results files with the same columns, such as
+    the per-shard files of a sharded crawl, which are concatenated. A single CSV
+    sink exported as CSV with its own header is copied as is. Otherwise the rows
+    are streamed through, with headers replacing the sink's header and, if
+    number_rows is set, a leading serial number column.
+    """
+    output_extension = os.path.splitext(output_path)[1].lower()
+    if (output_extension == '.csv' and isinstance(sink_path, str) and sink_path.lower().endswith('.csv')
+            and headers is None and not number_rows):
+        shutil.copyfile(sink_path, output_path)
+        return
+
+    rows = iter_result_rows(sink_path)
+    header = list(next(rows, []))
+    if headers is not None:
+        header = list(headers)
+    elif number_rows:
+        header = ['Sl'] + header
+
+    if output_extension == '.xlsx':
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(header)
+        for number, row in enumerate(rows, 1):
+            sheet.append([number, *row] if number_rows else list(row))
+        workbook.save(output_path)
+    else:
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for number, row in enumerate(rows, 1):
+                writer.writerow([number, *row] if number_rows else row)
+
+
+def results_path_for(source, root=DEFAULT_RESULTS_ROOT):
+    """Results file of a crawl of the domain file source, next to earlier runs of it."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    digest = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:8]
+    return os.path.join(root, f'{stem}-{digest}.csv')
@@ -1,30 +1,47 @@
 import scrapy
 import re
-import phonenumbers
-import time
-import pandas as pd
 from scrapy import signals
-from pydispatch import dispatcher
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest
 from scrapy.spidermiddlewares.httperror import HttpError
 from twisted.internet.error import DNSLookupError, TimeoutError
-from phoneScrapper.items import PhoneScrapperItem
+from phoneScrapper.patterns import PRIORITIZED_PATTERNS, get_phone_pattern_engine
+from phoneScrapper.page_analysis import PageAnalysis
+from phoneScrapper.validation import PhoneNumberValidator
+from phoneScrapper.countries import get_country_resolver
+from phoneScrapper.zip_index import DEFAULT_ZIP_INDEX_PATH, get_zip_index
+from phoneScrapper.tracking import DomainTracker
+from phoneScrapper.links import LinkFrontier, score_link
+from phoneScrapper.inputs import count_domains, iter_domains, unique_domains
+from phoneScrapper.checkpoint import CrawlCheckpoint
+from phoneScrapper.aggregation import DomainResultAggregator
+from phoneScrapper.sharding import iter_shard
 
 class PhoneScrapperSpider(scrapy.Spider):
     name = "phone_scrapper"
 
-    def __init__(self, domains=None, pause_event=None, excel_file_path=r"phoneScrapper\Country_zip.csv", *args, **kwargs):
+    def __init__(self, domains=None, pause_event=None, excel_file_path=DEFAULT_ZIP_INDEX_PATH, domains_file=None, resume=False, shard=0, shards=1, *args, **kwargs):
         super(PhoneScrapperSpider, self).__init__(*args, **kwargs)
-        self.domains = domains or []
+        # Domains are streamed from domains_file (.xlsx, .csv or .txt) when given, so
+        # large lists are never loaded in memory; otherwise taken from the domains list
+        if domains_file:
+            self.domains = iter_domains(domains_file)
+            self.total_urls = count_domains(domains_file)
+        else:
+            domains = domains or []
+            self.domains = unique_domains(domains)
+            self.total_urls = len(domains)
+        # In a sharded crawl each worker process only requests the domains of its shard
+        self.shard, self.shards = int(shard), int(shards)
+        self.domains = iter_shard(self.domains, self.shard, self.shards)
         self.pause_event = pause_event  
+        self.resume = resume in (True, '1', 'true', 'True')
+        self.checkpoint = None
         self.urls_scraped = 0
-        self.total_urls = len(self.domains)
-        self.visited_urls = set()
-        self.processed_urls = set() 
         self.social_media_domains = ['facebook.com', 'twitter.com', 'instagram.com', 'youtube.com']
-        self.parent_url_phone_numbers = {}
+        self.results = DomainResultAggregator()
+        self.domain_tracker = DomainTracker()
         self.processed_phone_numbers = set() 
         self.zip_to_country = self.load_zip_to_country(excel_file_path)
-        dispatcher.connect(self.spider_closed, signals.spider_closed)
 
         self.unwanted_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg',
                                     '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv',
@@ -32,53 +49,67 @@ class PhoneScrapperSpider(scrapy.Spider):
                                     '.zip', '.rar', '.tar', '.gz', '.7z',
                                     '.js', '.css')
         
-        self.prioritized_patterns = [
-            r'\(\d{3}\)\s?\d{3}[-\s]?\d{4}',  
-            r'\d{3}[\s-]\d{3}[-\s]\d{4}',  
-            r'\(\d{3}\)\d{3}[-\s]?\d{4}',  
-            r'\(\d{3}\)[-\s]?\d{3}[-\s]?\d{4}',  
-            r'\d{3}[.]\d{3}[.]\d{4}',  
-            r'\d{3}-\d{3}-\d{4}',  
-            r'\+\d{1}[\s]?\d{10}',  
-            r'\+\d{1}[\s]?\d{3}[.]\d{3}[.]\d{4}',  
-            r'\+\d{1}[\s]?\d{3}[-]\d{3}[-]\d{4}',  
-            r'1-\d{3}-\d{3}-\d{4}', 
-            r'\d{10}',  
-            r'1\s?\d{10}',  
-            r'1\s?\d{3}[.]\d{3}[.]\d{4}',  
-            r'1\s?\d{3}[-]\d{3}[-]\d{4}',  
-            r'1\(\d{3}\)\d{7}',  
-            r'1\(\d{3}\)[-]\d{3}[-]\d{4}',  
-            r'\+\d{1}[\s]?\d{3}[-\s]\d{3}[-\s]\d{4}',  
-            r'\+\d{1}[\s]?\d{3}[-]\d{3}[-][A-Z]{4}', 
-            r'\d{3}[-]\d{3}[-][A-Z]{4}', 
-            r'\d{3}[.]\d{3}[.][A-Z]{4}',  
-            r'\(\d{3}\)[-]\d{3}[-][A-Z]{4}', 
-            r'\(\d{3}\)\d{3}[-][A-Z]{4}',  
-            r'\d{3}\s\d{3}\s[A-Z]{3}',  
-            r'\d{3}\s\d{3}[-][A-Z]{4}',  
-            r'\(\d{3}\)\s\d{3}[-][A-Z]{4}',  
-            r'1-\d{3}-\d{3}-[A-Z]{4}',  
-            r'1\s\d{3}[.]\d{3}[.][A-Z]{4}',  
-            r'1\s\d{3}[-]\d{3}[-][A-Z]{4}', 
-        ]
+        self.prioritized_patterns = PRIORITIZED_PATTERNS
+        self.phone_pattern_engine = get_phone_pattern_engine(self.prioritized_patterns)
+        self.phone_validator = PhoneNumberValidator()
+        self.country_resolver = get_country_resolver()
+        self.link_frontier = LinkFrontier()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(PhoneScrapperSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.phone_validator = PhoneNumberValidator.from_settings(crawler.settings)
+        spider.link_frontier = LinkFrontier(crawler.settings.getint('MAX_LINKS_PER_DOMAIN', 10))
+        spider.results = DomainResultAggregator(provisional=crawler.settings.getbool('EMIT_PROVISIONAL_RESULTS'))
+        crawler.signals.connect(spider.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(spider.request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        # Only this crawler's spider_closed: a warm worker runs many crawls in one process
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+
+        # Checkpoint per-domain results when CHECKPOINT_DIR is set; flushed by CheckpointControl
+        spider.checkpoint = CrawlCheckpoint.from_settings(crawler.settings)
+        if spider.checkpoint is not None:
+            spider.checkpoint.open(resume=spider.resume)
+            spider.restore_checkpoint()
+        return spider
+
+    def restore_checkpoint(self):
+        """Reload the numbers found by an interrupted crawl; finished domains are not requested again."""
+        for parent_url, numbers in self.checkpoint.results.items():
+            self.results.add(parent_url, numbers)
+            if self.results.is_complete(parent_url):
+                self.domain_tracker.mark_satisfied(parent_url)
+            if self.checkpoint.is_completed(parent_url):
+                # Its record is already in the results of the earlier run
+                self.results.mark_emitted(parent_url)
+        if self.checkpoint.results:
+            self.logger.info(f"Resuming crawl: {len(self.checkpoint.completed)} domains finished, "
+                             f"{len(self.checkpoint.results) - len(self.checkpoint.completed)} partially crawled")
 
     def load_zip_to_country(self, excel_file_path):
-        df = pd.read_csv(excel_file_path)
-        zip_to_country = dict(zip(df['Zip'], df['Country']))
-        return zip_to_country
+        return get_zip_index(excel_file_path)  # Loaded once per process, kept by warm workers
 
     def start_requests(self):
-        urls = [self.convert_to_url(domain) for domain in self.domains]
-        self.logger.info(f"Starting requests for {len(urls)} URLs")
-        for url in urls:
+        # Scrapy pulls start requests lazily, so domains are read as the crawl goes
+        self.logger.info(f"Starting requests for up to {self.total_urls} URLs")
+        for domain in self.domains:
+            url = self.convert_to_url(domain)
+            if self.checkpoint is not None and self.checkpoint.is_completed(url):
+                self.logger.debug(f"Already finished in a previous run: {url}")
+                continue
             self.logger.info(f"Requesting URL: {url}")
-            while self.pause_event.is_set():  # Check pause event
-                self.logger.info(f"Pausing URL request: {url}")
-                time.sleep(1)
             yield scrapy.Request(url=url, callback=self.parse, errback=self.errback_handle, meta={'parent_url': url, 'is_parent': True})
 
     def parse(self, response):
+        try:
+            yield from self.parse_page(response)
+        finally:
+            self.request_finished(response.meta.get('parent_url'))
+            # Final records of the domains this response finished
+            yield from self.results.pop_ready()
+
+    def parse_page(self, response):
         parent_url = response.meta.get('parent_url')
         is_parent = response.meta.get('is_parent', False)
         self.logger.info(f"Parsing URL: {response.url} with parent: {parent_url}")
@@ -88,57 +119,48 @@ class PhoneScrapperSpider(scrapy.Spider):
             self.logger.info(f"Skipping unwanted file type: {response.url}")
             return
 
-        # Avoid revisiting the same URL
-        if response.url in self.visited_urls:
-            self.logger.info(f"Already visited URL: {response.url}")
+        # Ignore late sub-pages of domains that already have enough phone numbers
+        if self.domain_tracker.is_satisfied(parent_url):
+            self.logger.info(f"Domain already satisfied, skipping: {response.url}")
             return
-        self.visited_urls.add(response.url)
 
         # Extract phone numbers from the current page
         phone_numbers_with_countries = self.extract_phone_numbers(response)
         if phone_numbers_with_countries:
-            if parent_url not in self.parent_url_phone_numbers:
-                self.parent_url_phone_numbers[parent_url] = set()
-            new_phone_numbers = set(phone_numbers_with_countries) - self.parent_url_phone_numbers[parent_url]
+            new_phone_numbers = self.results.add(parent_url, phone_numbers_with_countries)
             if new_phone_numbers:
-                self.parent_url_phone_numbers[parent_url].update(new_phone_numbers)
                 self.logger.info(f"Extracted phone numbers: {new_phone_numbers} from {response.url}")
+                if self.checkpoint is not None:
+                    self.checkpoint.record(parent_url, self.results.get(parent_url))
 
-                # Yield the item with updated phone numbers, only if the URL has not been processed
-                if parent_url not in self.processed_urls:
-                    self.processed_urls.add(parent_url)
-                    item = PhoneScrapperItem()
-                    item['url'] = parent_url
-                    for i, (phone_number, country_code) in enumerate(list(self.parent_url_phone_numbers[parent_url])[:3]):
-                        item[f'phone_number_{i+1}'] = phone_number
-                        item[f'country_{i+1}'] = country_code
-                    yield item
+                # Early record of the domain, only if EMIT_PROVISIONAL_RESULTS is set
+                provisional_item = self.results.provisional_item(parent_url)
+                if provisional_item is not None:
+                    yield provisional_item
 
                 # Stop if we already have 3 phone numbers for this parent URL
-                if len(self.parent_url_phone_numbers[parent_url]) >= 3:
+                if self.results.is_complete(parent_url):
+                    self.domain_tracker.mark_satisfied(parent_url)
+                    self.domain_finished(parent_url)
                     return
 
-        # Follow only specific links if this is the parent URL
-        if is_parent and len(self.parent_url_phone_numbers.get(parent_url, [])) < 3:
-            links = response.css('a::attr(href)').getall()
+        # Follow the best ranked links if this is the parent URL, most promising first
+        if is_parent and not self.results.is_complete(parent_url):
+            links = PageAnalysis.for_response(response).links
             self.logger.info(f"Found {len(links)} links on {response.url}")
-            for link in links:
-                if self.is_relevant_link(response.url, link) and not self.is_social_media_link(link):
-                    self.logger.info(f"Following relevant link: {link}")
-                    while self.pause_event.is_set():  # Check pause event
-                        self.logger.info(f"Pausing URL follow: {link}")
-                        time.sleep(1)
-                    yield response.follow(link, self.parse, meta={'parent_url': parent_url})
+            selected = self.link_frontier.select(response.url, links,
+                                                 accept=lambda link: not self.is_social_media_link(link))
+            for priority, link in selected:
+                self.logger.info(f"Following relevant link: {link} (priority {priority})")
+                self.domain_tracker.request_started(parent_url)
+                yield response.follow(link, self.parse, errback=self.errback_handle, priority=priority,
+                                      meta={'parent_url': parent_url})
 
     def is_relevant_link(self, base_url, link):
         """
         Check if the link is relevant (i.e., home page, contact us, about us, services).
         """
-        keywords = ['contact', 'about', 'service', 'call', 'support', 'help', 'location', 'legal', 'blog', 'store', 'quote']
-        for keyword in keywords:
-            if re.search(keyword, link, re.IGNORECASE):
-                return True
-        return False
+        return score_link(link) > 0
 
     def is_internal_link(self, base_url, link):
         return link.startswith('/') or base_url in link
@@ -153,12 +175,14 @@ class PhoneScrapperSpider(scrapy.Spider):
     def extract_phone_numbers(self, response):
         phone_numbers_with_countries = []
         seen_numbers = set()
+        analysis = PageAnalysis.for_response(response)
 
         # Extract ZIP codes from the page
         zip_codes = self.extract_zip_codes(response)
+        zip_country = self.get_country_from_zip(zip_codes)
 
         # Extract phone numbers from the current page
-        hrefs = response.xpath('//a[starts-with(@href, "tel:")]/@href').getall()
+        hrefs = analysis.tel_hrefs
         self.logger.info(f"Phone numbers in href: {hrefs}")
         for href in hrefs:
             phone_number = href.split("tel:")[-1]
@@ -167,38 +191,25 @@ class PhoneScrapperSpider(scrapy.Spider):
                 if formatted_number not in seen_numbers:
                     seen_numbers.add(formatted_number)
                     self.processed_phone_numbers.add(formatted_number)
-                    country = self.get_country_from_zip(zip_codes) or self.get_country_from_number(formatted_number)
+                    country = zip_country or self.get_country_from_number(formatted_number)
                     phone_numbers_with_countries.append((formatted_number, country))
 
         # Extract phone numbers from text content
-        tags = response.xpath('//p | //span | //div | //li | //strong | //em | //footer | //section | //header | //aside | //blockquote | //address | //nav | //small | //article | //h1 | //h2 | //h3 | //h4 | //h5 | //h6')
-        for tag in tags:
-            text = tag.xpath('string()').get()
-            for pattern in self.prioritized_patterns:
-                prioritized_phone_pattern = re.compile(pattern)
-                prioritized_matches = prioritized_phone_pattern.findall(text)
-                for match in prioritized_matches:
-                    full_number = "".join(match).strip()
-                    formatted_number = self.format_phone_number(full_number)
-                    if self.is_valid_phone_number(formatted_number) and not self.is_css_number(tag, full_number):
-                        if formatted_number not in seen_numbers:
-                            seen_numbers.add(formatted_number)
-                            self.processed_phone_numbers.add(formatted_number)
-                            country = self.get_country_from_zip(zip_codes) or self.get_country_from_number(formatted_number)
-                            phone_numbers_with_countries.append((formatted_number, country))
+        for text, tag, offset in analysis.text_blocks:
+            for match in self.phone_pattern_engine.finditer(text):
+                full_number = match.group()
+                formatted_number = self.format_phone_number(full_number)
+                if self.is_valid_phone_number(formatted_number) and not self.is_css_number(tag, full_number, analysis, offset + match.start()):
+                    if formatted_number not in seen_numbers:
+                        seen_numbers.add(formatted_number)
+                        self.processed_phone_numbers.add(formatted_number)
+                        country = zip_country or self.get_country_from_number(formatted_number)
+                        phone_numbers_with_countries.append((formatted_number, country))
 
         return phone_numbers_with_countries
 
     def extract_zip_codes(self, response):
-        zip_pattern = re.compile(r'\b\d{5}\b')
-        tags = response.xpath('//p | //span | //div | //li | //strong | //em | //footer | //section | //header | //aside | //blockquote | //address | //nav | //small | //article | //h1 | //h2 | //h3 | //h4 | //h5 | //h6')
-        zip_codes = set()
-        for tag in tags:
-            text = tag.xpath('string()').get()
-            matches = zip_pattern.findall(text)
-            for match in matches:
-                zip_codes.add(match)
-        return zip_codes
+        return PageAnalysis.for_response(response).zip_codes
 
     def get_country_from_zip(self, zip_codes):
         for zip_code in zip_codes:
@@ -207,15 +218,10 @@ class PhoneScrapperSpider(scrapy.Spider):
         return None
 
     def get_country_from_number(self, phone_number):
-        try:
-            parsed_number = phonenumbers.parse(phone_number, "US")
-            if phonenumbers.is_valid_number(parsed_number):
-                return phonenumbers.region_code_for_number(parsed_number)
-        except phonenumbers.NumberParseException:
-            pass
-        return None
+        return self.country_resolver.resolve(phone_number)
 
     def convert_to_url(self, domain):
+        # The domain's parent_url; ConnectionStrategyMiddleware may request it as http:// or www.
         return f"https://{domain}"
 
     def format_phone_number(self, phone_number):
@@ -223,49 +229,65 @@ class PhoneScrapperSpider(scrapy.Spider):
         return re.sub(r'[^\d+]', '', phone_number)
 
     def is_valid_phone_number(self, phone_number):
-        digits = re.sub(r'\D', '', phone_number)
-        if len(digits) < 10 or len(digits) > 12:
-            return False
+        return self.phone_validator.is_valid(phone_number)
 
-        if re.match(r'(\d)\1{6,}', digits):  
+    def is_css_number(self, tag, full_number, analysis=None, offset=None):
+        parent = tag.getparent()
+        if parent is None:
             return False
+        if analysis is not None:
+            # offset is where full_number sits in the page text, which makes this an O(1) span check
+            return analysis.text_index.contains(parent, full_number, offset)
+        return full_number in parent.xpath('string()')
 
-        if "168" in digits or len(digits) > 11:  
-            return False
-        
-        if re.search(r'[-_]?\d{4}[-_]\d{4}', phone_number):  
-            return False
-        
-        id_patterns = [
-            r'shopify-\w+', 
-            r'template--\w+',
-            r'section-\w+',
-            r'ImageWithText-\w+',
-        ]
-        for pattern in id_patterns:
-            if re.search(pattern, phone_number):
-                return False
-        
-        if digits.startswith("1790"):
-            return False
-        
-        valid_phone_pattern = re.compile(    
-        r'(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}'
-        )
-        if valid_phone_pattern.match(phone_number):
-            return True
-
-        return True
-    
-    def is_css_number(self, tag, full_number):
-        parent = tag.xpath('parent::*')
-        if parent:
-            parent_text = parent.xpath('string()').get()
-            if full_number in parent_text:
-                return True
-        return False
+    def request_finished(self, parent_url):
+        if parent_url is None:
+            return
+        self.results.visit(parent_url)
+        if self.domain_tracker.request_finished(parent_url):
+            self.domain_finished(parent_url)
+
+    def request_scheduled(self, request, spider):
+        # A domain starts when its first request is scheduled rather than when
+        # start_requests yields it, since middlewares may read start requests ahead
+        # (DnsPrefetchMiddleware). Retries and re-issued requests keep the flag.
+        if request.meta.get('is_parent') and not request.meta.get('domain_started'):
+            request.meta['domain_started'] = True
+            self.domain_tracker.request_started(request.meta['parent_url'])
+            self.results.start(request.meta['parent_url'])
+
+    def request_dropped(self, request, spider):
+        # Duplicates rejected by the scheduler never reach parse or the errback
+        self.request_finished(request.meta.get('parent_url'))
+
+    def domain_finished(self, parent_url):
+        """Called once a domain has enough numbers or no outstanding requests left."""
+        if self.results.is_finished(parent_url):
+            return  # Satisfied earlier; its late requests just ran out
+        if self.checkpoint is not None:
+            self.checkpoint.record(parent_url, self.results.get(parent_url), done=True)
+        self.results.finish(parent_url)
+
+    def spider_idle(self, spider):
+        # Nothing is outstanding, so every started domain is finished; emit the records
+        # that could not be returned from a callback through one last local request
+        if not self.results.has_unfinished():
+            return
+        self.results.finish_all()
+        request = scrapy.Request('data:,', callback=self.emit_ready_results, dont_filter=True,
+                                 meta={'dont_obey_robotstxt': True, 'dont_cache': True})
+        self.crawler.engine.crawl(request)
+        raise DontCloseSpider
+
+    def emit_ready_results(self, response):
+        return self.results.pop_ready()
 
     def errback_handle(self, failure):
+        self.request_finished(failure.request.meta.get('parent_url'))
+        if failure.check(IgnoreRequest):
+            self.logger.debug(f"Ignored request: {failure.value}")
+            return self.results.pop_ready()
+
         self.logger.error(repr(failure))
         
         if failure.check(HttpError):
@@ -278,12 +300,20 @@ class PhoneScrapperSpider(scrapy.Spider):
             request = failure.request
             self.logger.error(f"Timeout error on {request.url}")
 
+        # Final records of the domains this failure finished
+        return self.results.pop_ready()
+
     def spider_closed(self, spider):
         self.logger.info(f"Spider closed: {spider.name}")
-        for parent_url, phone_numbers_with_countries in self.parent_url_phone_numbers.items():
-            item = PhoneScrapperItem()
-            item['url'] = parent_url
-            for i, (phone_number, country_code) in enumerate(list(phone_numbers_with_countries)[:3]):
-                item[f'phone_number_{i+1}'] = phone_number
-                item[f'country_{i+1}'] = country_code
-            self.crawler.signals.send_catch_log(signal=signals.item_scraped, item=item)
+        lookup_stats = {**self.phone_validator.get_stats(), **self.country_resolver.get_stats()}
+        self.logger.info(f"Phone lookup stats: {lookup_stats}")
+        if self.crawler.stats:
+            for key, value in lookup_stats.items():
+                self.crawler.stats.set_value(key, value)
+
+        # A crawl stopped early (e.g. shut down) never went idle: report the domains
+        # still open through the signal only, pipelines are already closed by now.
+        # Domains that were never fetched get no record; a resumed crawl requests them
+        self.results.finish_visited()
+        for item in self.results.pop_ready():
+            self.crawler.signals.send_catch_log(signal=signals.item_scraped, item=item, response=None, spider=self)
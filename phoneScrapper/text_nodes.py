@@ -0,0 +1,75 @@
+_ENTER = 0
+_EXIT = 1
+
+# Elements whose text content is scanned for phone numbers and ZIP codes.
+# Text is collected from anywhere inside one of these, however deeply nested.
+TEXT_CONTAINER_TAGS = frozenset([
+    'p', 'span', 'div', 'li', 'strong', 'em', 'footer', 'section', 'header', 'aside',
+    'blockquote', 'address', 'nav', 'small', 'article', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+])
+
+
+class TextIndex:
+    """
+    Offset index over the text content of an lxml tree, built in a single walk.
+
+    text is the string() value of root, i.e. all of its text nodes concatenated
+    in document order. spans maps every element to the (start, end) offsets of
+    its own string() value inside text, so the text of any element can be
+    addressed without materializing it. blocks lists (text, element, offset) for
+    every text node inside one of container_tags, where element owns the text
+    (the parent element for tail text) and offset is its position in text.
+
+    Comments and processing instructions contribute no text, but their tails
+    do. The walk is iterative so very deep documents don't hit the recursion limit.
+    """
+
+    def __init__(self, root, container_tags=TEXT_CONTAINER_TAGS):
+        parts = []
+        spans = {}
+        blocks = []
+        position = 0
+
+        # Stack entries are (node, event, start offset, node is inside a container, parent is inside a container)
+        stack = [(root, _ENTER, 0, False, False)]
+        while stack:
+            node, event, start, inside, parent_inside = stack.pop()
+            if event == _ENTER:
+                is_element = isinstance(node.tag, str)
+                inside = parent_inside or (is_element and node.tag in container_tags)
+                stack.append((node, _EXIT, position, inside, parent_inside))
+                if is_element:
+                    if node.text:
+                        if inside:
+                            blocks.append((node.text, node, position))
+                        parts.append(node.text)
+                        position += len(node.text)
+                    for child in reversed(node):
+                        stack.append((child, _ENTER, 0, False, inside))
+                continue
+
+            if isinstance(node.tag, str):
+                spans[node] = (start, position)
+            if node is not root and node.tail:
+                if parent_inside:
+                    blocks.append((node.tail, node.getparent(), position))
+                parts.append(node.tail)
+                position += len(node.tail)
+
+        self.text = ''.join(parts)
+        self.spans = spans
+        self.blocks = blocks
+
+    def contains(self, element, needle, offset=None):
+        """
+        Return True if needle occurs in the string() value of element.
+
+        When offset is the position in text where needle is known to occur, the
+        check is a constant time span comparison; otherwise the element's span is
+        searched in place.
+        """
+        start, end = self.spans[element]
+        if offset is not None and start <= offset and offset + len(needle) <= end \
+                and self.text.startswith(needle, offset):
+            return True
+        return self.text.find(needle, start, end) != -1
@@ -0,0 +1,34 @@
+class DomainTracker:
+    """
+    Per-domain crawl state shared by the spider and its middlewares.
+
+    Domains are identified by the parent_url of their requests. A domain is
+    satisfied once enough phone numbers were found for it; its remaining requests
+    and responses are then dropped by DomainCompletionMiddleware.
+
+    The tracker also counts each domain's outstanding requests: request_started
+    when a request is yielded, request_finished once it was parsed, failed or was
+    dropped. A domain is finished when its count drops back to zero.
+    """
+
+    def __init__(self):
+        self.satisfied = set()
+        self.pending = {}
+
+    def request_started(self, parent_url):
+        self.pending[parent_url] = self.pending.get(parent_url, 0) + 1
+
+    def request_finished(self, parent_url):
+        """Return True if this was the last outstanding request of the domain."""
+        remaining = self.pending.get(parent_url, 0) - 1
+        if remaining > 0:
+            self.pending[parent_url] = remaining
+            return False
+        self.pending.pop(parent_url, None)
+        return True
+
+    def mark_satisfied(self, parent_url):
+        self.satisfied.add(parent_url)
+
+    def is_satisfied(self, parent_url):
+        return parent_url in self.satisfied
@@ -0,0 +1,79 @@
+import queue
+
+# Put on the item queue after the last batch of a crawl
+END_OF_STREAM = None
+
+
+class StreamEndedEarly(Exception):
+    """The producers were gone before each of them sent END_OF_STREAM."""
+
+
+class ItemBatcher:
+    """
+    Send scraped items to another process in batches over a multiprocessing queue.
+
+    Items are buffered and put on the queue as one list when batch_size items have
+    accumulated, or every interval seconds while the crawl runs, whichever comes
+    first. close() flushes what is left and puts END_OF_STREAM.
+    """
+
+    def __init__(self, item_queue, batch_size=50, interval=0.25):
+        self.item_queue = item_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self.buffer = []
+        self.task = None
+        self.closed = False
+
+    def start(self):
+        """Start the periodic flush; must be called from the reactor thread."""
+        from twisted.internet import task
+
+        self.task = task.LoopingCall(self.flush)
+        self.task.start(self.interval, now=False)
+
+    def add(self, item):
+        self.buffer.append(item)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            batch, self.buffer = self.buffer, []
+            self.item_queue.put(batch)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.task is not None and self.task.running:
+            self.task.stop()
+        self.flush()
+        self.item_queue.put(END_OF_STREAM)
+
+
+def iter_item_batches(item_queue, is_alive, timeout=1.0, producers=1, on_idle=None, strict=False):
+    """
+    Yield item batches from item_queue until each of producers sent END_OF_STREAM.
+
+    Blocks on the queue instead of polling it, calling on_idle() (if given) each
+    time nothing arrives for timeout seconds. If is_alive() then reports the
+    producers are gone (they crashed or were terminated before sending
+    END_OF_STREAM), iteration stops as well, or raises StreamEndedEarly if strict.
+    """
+    remaining = producers
+    while remaining:
+        try:
+            batch = item_queue.get(timeout=timeout)
+        except queue.Empty:
+            if on_idle is not None:
+                on_idle()
+            if not is_alive():
+                if strict:
+                    raise StreamEndedEarly(f"{remaining} of {producers} producers ended without END_OF_STREAM")
+                return
+            continue
+        if batch is END_OF_STREAM:
+            remaining -= 1
+            continue
+        yield batch
@@ -0,0 +1,87 @@
+import hashlib
+import math
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from w3lib.url import canonicalize_url as w3lib_canonicalize_url
+
+# Query parameters that only track where a visitor came from and never change the page
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = frozenset((
+    'gclid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok',
+))
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def is_tracking_param(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url):
+    """
+    Return the form of url used to decide whether two URLs are the same page.
+
+    Builds on w3lib's canonicalization (lowercase scheme and host, sorted query,
+    normalized percent-encoding, no fragment), then drops tracking parameters and
+    default ports. Trailing slashes are kept: /contact and /contact/ can be
+    different pages, and sites commonly redirect from one to the other.
+    """
+    parts = urlsplit(w3lib_canonicalize_url(url))
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if parts.port is not None and DEFAULT_PORTS.get(scheme) == parts.port:
+        netloc = netloc.rsplit(':', 1)[0]
+    path = parts.path or '/'
+    query = urlencode([(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if not is_tracking_param(name)])
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class UrlFingerprintSet:
+    """
+    Bloom filter of canonical URLs, so memory stays flat however many URLs are seen.
+
+    capacity URLs take about 1.2 * log2(1 / error_rate) bytes each (roughly 2.4 MB
+    for a million URLs at the default rate). A URL that was never added is reported
+    as seen with probability error_rate; that rate grows once more than capacity
+    URLs were added. Added URLs are never reported as unseen.
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.0001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(canonicalize_url(url).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, url):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+    def add(self, url):
+        """Add url; return True if it was not seen before."""
+        new = False
+        for position in self._positions(url):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def over_capacity(self):
+        return self.count > self.capacity
@@ -0,0 +1,95 @@
+import re
+from collections import OrderedDict
+
+# Rules that reject a formatted phone number, checked in order. Each rule is
+# (name, target, pattern, mode): target is 'digits' to test only the digits of
+# the number or 'number' to test the formatted number itself, and mode is the
+# re method used, 'match' or 'search'. Any hit rejects the number.
+DEFAULT_REJECT_RULES = (
+    ('length', 'digits', r'(?!\d{10,12}$)', 'match'),
+    ('repeated_digits', 'digits', r'(\d)\1{6,}', 'match'),
+    ('contains_168', 'digits', r'168', 'search'),
+    ('too_long', 'digits', r'\d{12}', 'search'),
+    ('digit_blocks', 'number', r'[-_]?\d{4}[-_]\d{4}', 'search'),
+    ('shopify_id', 'number', r'shopify-\w+', 'search'),
+    ('template_id', 'number', r'template--\w+', 'search'),
+    ('section_id', 'number', r'section-\w+', 'search'),
+    ('image_with_text_id', 'number', r'ImageWithText-\w+', 'search'),
+    ('prefix_1790', 'digits', r'1790', 'match'),
+)
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+class PhoneNumberValidator:
+    """
+    Decide whether a formatted phone number is plausible using a table of reject rules.
+
+    Rules are compiled once. Verdicts are kept in a bounded LRU cache keyed on the
+    formatted number, and rule_hits counts how many numbers each rule rejected,
+    cached verdicts included, so it reflects what the filters actually see.
+    """
+
+    def __init__(self, rules=DEFAULT_REJECT_RULES, cache_size=4096):
+        self.rules = []
+        for name, target, pattern, mode in rules:
+            self.rules.append((name, target == 'digits', getattr(re.compile(pattern), mode)))
+        self.rule_hits = {name: 0 for name, _, _ in self.rules}
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """
+        Build a validator from PHONE_VALIDATOR_RULES and PHONE_VALIDATOR_CACHE_SIZE.
+
+        PHONE_VALIDATOR_RULES entries use the DEFAULT_REJECT_RULES layout and are
+        added after the defaults. An entry reusing a default rule's name replaces
+        it, and an entry whose pattern is None disables it.
+        """
+        rules = OrderedDict((rule[0], rule) for rule in DEFAULT_REJECT_RULES)
+        for name, target, pattern, *mode in settings.getlist('PHONE_VALIDATOR_RULES'):
+            if pattern is None:
+                rules.pop(name, None)
+            else:
+                rules[name] = (name, target, pattern, mode[0] if mode else 'search')
+        return cls(rules.values(), settings.getint('PHONE_VALIDATOR_CACHE_SIZE', 4096))
+
+    def rejecting_rule(self, phone_number):
+        """Return the name of the first rule rejecting phone_number, or None if it is valid."""
+        try:
+            rule = self._cache[phone_number]
+        except KeyError:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            self._cache.move_to_end(phone_number)
+            return rule
+
+        rule = self._evaluate(phone_number)
+        self._cache[phone_number] = rule
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rule
+
+    def is_valid(self, phone_number):
+        rule = self.rejecting_rule(phone_number)
+        if rule is None:
+            return True
+        self.rule_hits[rule] += 1
+        return False
+
+    def get_stats(self):
+        stats = {f'phone_validator/rejected/{name}': hits for name, hits in self.rule_hits.items()}
+        stats['phone_validator/cache_hits'] = self.cache_hits
+        stats['phone_validator/cache_misses'] = self.cache_misses
+        return stats
+
+    def _evaluate(self, phone_number):
+        digits = _NON_DIGITS.sub('', phone_number)
+        for name, on_digits, check in self.rules:
+            if check(digits if on_digits else phone_number):
+                return name
+        return None
@@ -0,0 +1,243 @@
+"""
+Crawl processes that stay up between crawls and take jobs over a command queue.
+
+Starting a crawl process means importing Scrapy and the spider, loading the ZIP
+index and starting a reactor, which takes seconds; for a single-domain lookup it
+is most of the wait. A CrawlWorkerPool starts its processes once, they warm up in
+the background, and every crawl after that runs in an already running reactor
+through a CrawlerRunner.
+
+Only the parent-side pool is light to import: Scrapy is imported in the worker
+processes (serve), never in the process that creates the pool.
+"""
+import logging
+import threading
+from collections import deque
+from multiprocessing import Event, Lock, Process, Queue
+
+from phoneScrapper.sharding import shard_path
+from phoneScrapper.transport import END_OF_STREAM
+
+# Commands, sent as (command, job) tuples
+CRAWL = 'crawl'
+STOP = 'stop'
+SHUTDOWN = 'shutdown'
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlWorkerPool:
+    """
+    Warm crawl worker processes sharing one item queue.
+
+    crawl() hands a job to the first workers of the pool, one shard each. Every
+    worker taking part puts its items on item_queue in batches and END_OF_STREAM
+    when its part of the crawl is over, including when it was stopped or failed,
+    so consumers read with iter_item_batches(pool.item_queue, pool.is_alive,
+    producers=<crawl() result>). For a worker that died before ending its stream,
+    is_alive() puts END_OF_STREAM on its behalf. Workers that died are replaced on
+    the next crawl.
+    """
+
+    def __init__(self, workers=1, pause_event=None):
+        self.workers = workers
+        self.pause_event = pause_event or Event()
+        self.item_queue = Queue()
+        self.zip_index_lock = Lock()  # Held while a worker loads the ZIP index, so only the first one builds it
+        self.processes = []
+        self.command_queues = []
+        self.streams_ended = []  # Per worker, set once it put END_OF_STREAM for the current crawl
+        self.active = 0  # Workers taking part in the current crawl
+        self.ended_for_dead = set()  # Workers of the current crawl whose END_OF_STREAM the pool sent
+
+    def start(self):
+        """Start the missing or dead workers; returns immediately, they warm up on their own."""
+        for index in range(self.workers):
+            if index < len(self.processes) and self.processes[index].is_alive():
+                continue
+            command_queue = Queue()
+            stream_ended = Event()
+            process = Process(target=serve, args=(command_queue, self.item_queue, self.pause_event, stream_ended,
+                                                  self.zip_index_lock),
+                              name=f'crawl-worker-{index}', daemon=True)
+            process.start()
+            if index < len(self.processes):
+                self.processes[index], self.command_queues[index] = process, command_queue
+                self.streams_ended[index] = stream_ended
+            else:
+                self.processes.append(process)
+                self.command_queues.append(command_queue)
+                self.streams_ended.append(stream_ended)
+
+    def resize(self, workers):
+        """Keep workers processes: extra ones are shut down, missing ones started."""
+        for command_queue in self.command_queues[workers:]:
+            command_queue.put((SHUTDOWN, None))
+        for process in self.processes[workers:]:
+            process.join(5)
+        del self.processes[workers:], self.command_queues[workers:], self.streams_ended[workers:]
+        self.workers = workers
+        self.start()
+
+    def crawl(self, domains=None, domains_file=None, checkpoint_dir=None, resume=False, results_path=None,
+              extra_settings=None, workers=None):
+        """
+        Crawl the domains (or domains_file) on the pool, sharded over workers of its workers (all by default).
+
+        Returns the number of workers taking part. Checkpoints and results files are
+        per shard, as with phoneScrapper.runner.start_workers.
+        """
+        self.start()
+        shards = min(workers or self.workers, self.workers)
+        for shard in range(shards):
+            self.streams_ended[shard].clear()
+            self.command_queues[shard].put((CRAWL, {
+                'domains': domains, 'domains_file': domains_file, 'resume': resume,
+                'checkpoint_dir': checkpoint_dir and shard_path(checkpoint_dir, shard, shards),
+                'results_path': results_path and shard_path(results_path, shard, shards),
+                'shard': shard, 'shards': shards, 'extra_settings': extra_settings,
+            }))
+        self.active = shards
+        self.ended_for_dead = set()
+        return shards
+
+    def stop_crawl(self):
+        """Stop the current crawl; workers close their spiders and end their item streams."""
+        for command_queue in self.command_queues[:self.active]:
+            command_queue.put((STOP, None))
+
+    def is_alive(self):
+        """
+        Whether the current crawl may still send items.
+
+        Warm workers outlive a crawl, so one worker dying must not leave consumers
+        waiting for its END_OF_STREAM while the others stay up: it is put on the
+        queue for the dead worker, and reading goes on until that marker is read.
+        """
+        ended = False
+        for index in range(self.active):
+            if index in self.ended_for_dead or self.streams_ended[index].is_set() \
+                    or self.processes[index].is_alive():
+                continue
+            logger.error(f"Crawl worker {index} died (exit code {self.processes[index].exitcode})")
+            self.ended_for_dead.add(index)
+            self.item_queue.put(END_OF_STREAM)
+            ended = True
+        return ended or any(process.is_alive() for process in self.processes[:self.active])
+
+    def shutdown(self, timeout=5):
+        for command_queue in self.command_queues:
+            command_queue.put((SHUTDOWN, None))
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.processes, self.command_queues, self.streams_ended, self.active = [], [], [], 0
+
+
+class CrawlService:
+    """Runs the jobs of one worker process, one at a time, in the reactor thread."""
+
+    def __init__(self, reactor, item_queue, pause_event, stream_ended):
+        self.reactor = reactor
+        self.item_queue = item_queue
+        self.pause_event = pause_event
+        self.stream_ended = stream_ended
+        self.jobs = deque()
+        self.crawler = None
+        self.batcher = None
+        self.shutting_down = False
+
+    def read_commands(self, command_queue):
+        """Forward commands to the reactor thread; runs in its own thread, blocked on the queue."""
+        while True:
+            command, job = command_queue.get()
+            self.reactor.callFromThread(self.handle, command, job)
+            if command == SHUTDOWN:
+                return
+
+    def handle(self, command, job):
+        if command == CRAWL:
+            self.jobs.append(job)
+            if self.crawler is None:
+                self.next_job()
+        elif command == STOP:
+            self.jobs.clear()
+            if self.crawler is not None:
+                self.crawler.stop()
+        elif command == SHUTDOWN:
+            self.shutting_down = True
+            self.jobs.clear()
+            if self.crawler is not None:
+                self.crawler.stop()  # The reactor stops once the crawl is closed
+            else:
+                self.reactor.stop()
+
+    def next_job(self):
+        if self.shutting_down:
+            self.reactor.stop()
+            return
+        if not self.jobs:
+            return
+        from scrapy import signals
+        from scrapy.crawler import CrawlerRunner
+
+        from phoneScrapper.runner import crawl_settings
+        from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+        from phoneScrapper.transport import ItemBatcher
+
+        job = self.jobs.popleft()
+        settings = crawl_settings(job['checkpoint_dir'], job['resume'], job['results_path'], job['extra_settings'],
+                                  job['shard'], job['shards'])
+        self.batcher = ItemBatcher(self.item_queue, settings.getint('ITEM_BATCH_SIZE'),
+                                   settings.getfloat('ITEM_BATCH_INTERVAL'))
+        self.crawler = CrawlerRunner(settings).create_crawler(PhoneScrapperSpider)
+        self.crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        self.crawler.signals.connect(self.item_scraped, signal=signals.item_scraped)
+        deferred = self.crawler.crawl(domains=job['domains'], domains_file=job['domains_file'], pause_event=self.pause_event,
+                                      resume=job['resume'], shard=job['shard'], shards=job['shards'])
+        deferred.addErrback(self.crawl_failed)
+        deferred.addBoth(self.crawl_finished)
+
+    def spider_opened(self, spider):
+        self.batcher.start()
+
+    def item_scraped(self, item, response, spider):
+        self.batcher.add(dict(item))
+
+    def crawl_failed(self, failure):
+        logger.error(f"Crawl failed: {failure.getTraceback()}")
+
+    def crawl_finished(self, _):
+        # Also reached when the spider failed to open, so the consumer always gets END_OF_STREAM
+        self.batcher.close()
+        self.stream_ended.set()
+        self.crawler = self.batcher = None
+        self.next_job()
+
+
+def serve(command_queue, item_queue, pause_event, stream_ended, zip_index_lock):
+    """Worker process: warm up, then run the crawls sent on command_queue until SHUTDOWN."""
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    settings = get_project_settings()
+    if settings.get('TWISTED_REACTOR'):
+        install_reactor(settings['TWISTED_REACTOR'])
+    from twisted.internet import reactor
+
+    configure_logging(settings)
+
+    # Imported and loaded once for all the crawls of this process
+    from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider  # noqa: F401
+    from phoneScrapper.zip_index import DEFAULT_ZIP_INDEX_PATH, get_zip_index
+
+    # A missing or stale snapshot is rebuilt by the first worker; the others wait and load it
+    with zip_index_lock:
+        get_zip_index(DEFAULT_ZIP_INDEX_PATH)
+
+    service = CrawlService(reactor, item_queue, pause_event, stream_ended)
+    threading.Thread(target=service.read_commands, args=(command_queue,), daemon=True).start()
+    reactor.run()
@@ -0,0 +1,209 @@
+import array
+import bisect
+import csv
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ZIP_INDEX_PATH = os.path.join(PROJECT_DIR, 'Country_zip.zidx')
+# Excel files the index is built from by default, looked up next to the index
+DEFAULT_SOURCES = (('USA_Data.xlsx', 'US'), ('Canada_Data.xlsx', 'CA'))
+
+SNAPSHOT_SUFFIX = '.zidx'
+SNAPSHOT_MAGIC = b'PSZI'
+SNAPSHOT_VERSION = 1
+
+# magic, format version, number of countries, number of entries, sha256 of the source data
+_HEADER = struct.Struct('<4sHHI32s')
+_CANADIAN_POSTAL_CODE = re.compile(r'([A-Z])(\d)([A-Z])(?:\d[A-Z]\d)?')
+_FSA_BASE = 100000
+
+
+def normalize_postal_code(code):
+    """
+    Return the integer key for a US ZIP or Canadian postal code, or None if code is neither.
+
+    US ZIPs map to their numeric value, so '00601' and a CSV value that lost its
+    leading zeros ('601') share a key. Canadian postal codes map to their forward
+    sortation area (the first three characters), placed above the ZIP range.
+    """
+    code = str(code).strip().upper()
+    if code.isdigit():
+        return int(code) if len(code) <= 5 else None
+    match = _CANADIAN_POSTAL_CODE.fullmatch(code.replace(' ', ''))
+    if match is None:
+        return None
+    first, digit, third = match.groups()
+    return _FSA_BASE + ((ord(first) - 65) * 10 + int(digit)) * 26 + (ord(third) - 65)
+
+
+def file_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.digest()
+
+
+class ZipIndex:
+    """
+    Read-only postal code -> country code mapping stored as two parallel arrays.
+
+    keys holds the sorted normalized postal codes and values the index of each
+    code's country in countries; lookups are a binary search. An index can be
+    saved as a binary snapshot and loaded back through mmap without parsing.
+    """
+
+    def __init__(self, keys, values, countries, source_digest=b''):
+        self.keys = keys
+        self.values = values
+        self.countries = tuple(countries)
+        self.source_digest = source_digest
+
+    @classmethod
+    def from_pairs(cls, pairs, source_digest=b''):
+        """Build an index from (postal code, country) pairs; later pairs win, as with a dict."""
+        mapping = {}
+        for code, country in pairs:
+            key = normalize_postal_code(code)
+            if key is not None and country:
+                mapping[key] = str(country).strip().upper()
+
+        countries = sorted(set(mapping.values()))
+        country_ids = {country: i for i, country in enumerate(countries)}
+        keys = array.array('I', sorted(mapping))
+        values = array.array('B', (country_ids[mapping[key]] for key in keys))
+        return cls(keys, values, countries, source_digest)
+
+    @classmethod
+    def from_csv(cls, path, zip_column='Zip', country_column='Country'):
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            index = cls.from_pairs((row[zip_column], row[country_column]) for row in reader)
+        index.source_digest = file_digest(path)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+
+        magic, version, country_count, count, source_digest = _HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} ZIP index snapshot")
+
+        offset = _HEADER.size
+        countries = [bytes(view[offset + 2 * i:offset + 2 * i + 2]).decode('ascii') for i in range(country_count)]
+        offset = _align(offset + 2 * country_count)
+        keys = view[offset:offset + 4 * count]
+        values = view[offset + 4 * count:offset + 5 * count]
+
+        if sys.byteorder == 'little':
+            keys = keys.cast('I')
+        else:
+            keys = array.array('I', keys)
+            keys.byteswap()
+        return cls(keys, values, countries, source_digest)
+
+    def save(self, path):
+        """
+        Write the index as a snapshot, replacing path atomically.
+
+        Crawl processes may rebuild the same snapshot at once, so each writes its
+        own temporary file and the last one to finish wins.
+        """
+        if any(len(country) != 2 for country in self.countries):
+            raise ValueError("ZIP index snapshots only hold two-letter country codes")
+        keys = array.array('I', self.keys)
+        if sys.byteorder != 'little':
+            keys.byteswap()
+
+        header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self.countries), len(keys),
+                              self.source_digest.ljust(32, b'\0'))
+        country_block = ''.join(self.countries).encode('ascii')
+        padding = b'\0' * (_align(len(header) + len(country_block)) - len(header) - len(country_block))
+
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'wb') as f:
+            f.write(header + country_block + padding)
+            f.write(keys.tobytes())
+            f.write(bytes(self.values))
+        os.replace(tmp_path, path)
+
+    def get(self, code, default=None):
+        key = normalize_postal_code(code)
+        if key is not None:
+            i = bisect.bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                return self.countries[self.values[i]]
+        return default
+
+    def __getitem__(self, code):
+        country = self.get(code)
+        if country is None:
+            raise KeyError(code)
+        return country
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def _align(offset, size=4):
+    return (offset + size - 1) // size * size
+
+
+_zip_indexes = {}
+
+
+def get_zip_index(path=DEFAULT_ZIP_INDEX_PATH):
+    """Return the process-wide index for path, loading it on first use."""
+    key = os.path.abspath(path)
+    if key not in _zip_indexes:
+        _zip_indexes[key] = load_zip_index(path)
+    return _zip_indexes[key]
+
+
+def load_zip_index(path=DEFAULT_ZIP_INDEX_PATH):
+    """
+    Load a ZIP index from a snapshot or a Zip/Country CSV file.
+
+    For a snapshot with the default Excel sources next to it, the snapshot is
+    rebuilt first if the sources' checksum no longer matches (see
+    phoneScrapper.build_zip_index). For a CSV, the snapshot next to it is used
+    when it was built from the same CSV contents; otherwise the CSV is parsed and
+    the snapshot (re)written.
+    """
+    if path.endswith(SNAPSHOT_SUFFIX):
+        from phoneScrapper.build_zip_index import build_zip_index, default_sources
+
+        sources = default_sources(path)
+        if sources:
+            return build_zip_index(sources, path)[0]
+        return ZipIndex.load(path)
+
+    snapshot_path = os.path.splitext(path)[0] + SNAPSHOT_SUFFIX
+    source_digest = file_digest(path)
+    if os.path.exists(snapshot_path):
+        try:
+            index = ZipIndex.load(snapshot_path)
+        except ValueError:
+            pass
+        else:
+            if index.source_digest == source_digest:
+                return index
+
+    index = ZipIndex.from_csv(path)
+    try:
+        index.save(snapshot_path)
+    except OSError:
+        pass
+    return index
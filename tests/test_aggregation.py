@@ -0,0 +1,57 @@
+from phoneScrapper.aggregation import DomainResultAggregator
+
+
+def test_one_final_record_per_domain():
+    results = DomainResultAggregator(numbers_per_domain=2)
+    results.start('https://a.com')
+    results.add('https://a.com', [('111', 'US'), ('111', 'US'), ('222', 'CA'), ('333', 'US')])
+    results.finish('https://a.com')
+    results.finish('https://a.com')
+    items = results.pop_ready()
+    assert [dict(item) for item in items] == [{'url': 'https://a.com', 'phone_number_1': '111', 'country_1': 'US',
+                                               'phone_number_2': '222', 'country_2': 'CA', 'final': True}]
+    assert results.pop_ready() == []
+
+
+def test_stopped_crawl_skips_domains_never_fetched():
+    results = DomainResultAggregator()
+    for parent_url in ('https://visited.com', 'https://numbers.com', 'https://queued.com'):
+        results.start(parent_url)
+    results.visit('https://visited.com')
+    results.add('https://numbers.com', [('111', 'US')])
+
+    results.finish_visited()
+    assert sorted(item['url'] for item in results.pop_ready()) == ['https://numbers.com', 'https://visited.com']
+    assert results.has_unfinished()
+
+
+def test_provisional_record_before_final():
+    results = DomainResultAggregator(provisional=True)
+    results.start('https://a.com')
+    assert results.provisional_item('https://a.com') is None
+    results.add('https://a.com', [('111', 'US')])
+    assert results.provisional_item('https://a.com')['final'] is False
+    assert results.provisional_item('https://a.com') is None
+    results.finish_all()
+    assert [item['final'] for item in results.pop_ready()] == [True]
+
+
+def test_finished_domains_are_forgotten():
+    results = DomainResultAggregator(numbers_per_domain=1, provisional=True)
+    results.start('https://a.com')
+    results.visit('https://a.com')
+    results.add('https://a.com', [('111', 'US')])
+    assert results.provisional_item('https://a.com') is not None
+    results.finish('https://a.com')
+    assert results.has_unfinished()
+    assert [item['phone_number_1'] for item in results.pop_ready()] == ['111']
+
+    assert not results.numbers and not results.visited and not results.provisional_emitted
+    assert not results.has_unfinished()
+    # Late pages and requests of the finished domain leave no trace and no second record
+    assert results.add('https://a.com', [('222', 'US')]) == []
+    results.visit('https://a.com')
+    results.finish('https://a.com')
+    results.finish_all()
+    assert results.is_finished('https://a.com') and results.pop_ready() == []
+    assert not results.numbers and not results.visited
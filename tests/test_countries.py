@@ -0,0 +1,34 @@
+import phonenumbers
+
+from phoneScrapper.countries import _NANP_AREA_CODES, NANP_AREA_CODE_REGIONS, CountryResolver
+
+# Exchanges and subscriber numbers sampled for every area code
+EXCHANGES = [f'{digit}{rest}' for digit in '23456789' for rest in ('00', '55', '99')]
+SUBSCRIBERS = ('0000', '4321', '9999')
+
+
+def test_area_code_table_matches_phonenumbers():
+    mismatches = []
+    for region, area_codes in _NANP_AREA_CODES.items():
+        for area_code in area_codes.split():
+            for exchange in EXCHANGES:
+                for subscriber in SUBSCRIBERS:
+                    number = phonenumbers.parse(f'+1{area_code}{exchange}{subscriber}')
+                    if not phonenumbers.is_valid_number(number) \
+                            or phonenumbers.region_code_for_number(number) != region:
+                        mismatches.append((region, area_code, exchange, subscriber))
+    assert mismatches == []
+
+
+def test_area_codes_belong_to_one_region():
+    area_codes = [area_code for codes in _NANP_AREA_CODES.values() for area_code in codes.split()]
+    assert len(area_codes) == len(NANP_AREA_CODE_REGIONS)
+
+
+def test_fast_path_agrees_with_full_parse():
+    resolver = CountryResolver()
+    for area_code in list(NANP_AREA_CODE_REGIONS)[::10]:
+        for number in (f'{area_code}5550100', f'1{area_code}5550100', f'+1{area_code}5550100',
+                       f'{area_code}1550100', f'+{area_code}5550100'):
+            assert resolver.resolve(number) == resolver._parse(number), number
+    assert resolver.fast_path_hits
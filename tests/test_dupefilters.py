@@ -0,0 +1,58 @@
+from scrapy import Request, Spider
+from scrapy.downloadermiddlewares.redirect import RedirectMiddleware
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+
+from phoneScrapper.dupefilters import CanonicalUrlDupeFilter
+from phoneScrapper.urls import canonicalize_url
+
+
+def follow_redirect(request, location, status=301):
+    crawler = get_crawler(Spider)
+    spider = crawler._create_spider('test')
+    middleware = RedirectMiddleware.from_crawler(crawler)
+    response = Response(request.url, status=status, headers={'Location': location}, request=request)
+    return middleware.process_response(request, response, spider)
+
+
+def test_canonical_url_keeps_trailing_slash():
+    assert canonicalize_url('https://example.com/contact') != canonicalize_url('https://example.com/contact/')
+    assert canonicalize_url('https://example.com') == canonicalize_url('https://example.com/')
+
+
+def test_canonical_url_drops_tracking_params_and_default_port():
+    assert (canonicalize_url('HTTPS://Example.com:443/contact/?utm_source=x&b=2&a=1#top')
+            == 'https://example.com/contact/?a=1&b=2')
+
+
+def test_duplicates_are_filtered():
+    dupefilter = CanonicalUrlDupeFilter(capacity=1000)
+    assert not dupefilter.request_seen(Request('https://example.com/contact?utm_source=x'))
+    assert dupefilter.request_seen(Request('https://example.com/contact'))
+    assert dupefilter.request_seen(Request('https://example.com/contact#form'))
+
+
+def test_non_get_requests_are_not_filtered():
+    dupefilter = CanonicalUrlDupeFilter(capacity=1000)
+    assert not dupefilter.request_seen(Request('https://example.com/form', method='POST'))
+    assert not dupefilter.request_seen(Request('https://example.com/form', method='POST'))
+
+
+def test_slash_redirect_target_is_not_filtered():
+    dupefilter = CanonicalUrlDupeFilter(capacity=1000)
+    request = Request('https://example.com/contact?utm_source=x')
+    assert not dupefilter.request_seen(request)
+
+    redirected = follow_redirect(request, '/contact/?utm_source=x')
+    assert redirected.url == 'https://example.com/contact/?utm_source=x'
+    assert not dupefilter.request_seen(redirected)
+
+
+def test_redirect_to_canonical_form_is_not_filtered():
+    # The target has the same canonical URL as the request that caused it
+    dupefilter = CanonicalUrlDupeFilter(capacity=1000)
+    request = Request('https://example.com/contact?utm_source=x')
+    assert not dupefilter.request_seen(request)
+    assert not dupefilter.request_seen(follow_redirect(request, '/contact'))
+    # It is still recorded for the requests that come later
+    assert dupefilter.request_seen(Request('https://example.com/contact'))
@@ -0,0 +1,11 @@
+import pytest
+
+from phoneScrapper.import_time import HEAVY_MODULES, measure
+
+
+def test_gui_does_not_import_the_crawl_stack():
+    pytest.importorskip('PyQt5.QtWidgets')
+    _, imports = measure('app')
+    loaded = {name.split('.')[0] for name, _, _ in imports}
+    assert 'phoneScrapper' in loaded
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
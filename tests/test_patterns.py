@@ -0,0 +1,37 @@
+import re
+
+from phoneScrapper.patterns import PRIORITIZED_PATTERNS, get_phone_pattern_engine
+
+SAMPLE_TEXTS = [
+    '18005551234',
+    '+1 8005551234',
+    '1(800)5551234',
+    'Call 1-800-555-1234 or (212) 555-0100, fax 212.555.0199.',
+    '+1 212-555-0100 / +1 212.555.0100 / +18005551234',
+    'Toll free 1 800 555 1234 and 1 800-555-FLOW, text 800-555-PIZZA',
+    '(800)-555-1234 (800)555-TOYS 1(800)-555-1234 212 555 ABC',
+    'Order 1234567890123 shipped, ref 555-1234, zip 10001',
+    'no numbers here',
+    '',
+]
+
+
+def old_findall(text):
+    # The spider's original loop: every pattern on its own, in priority order
+    return [match for pattern in PRIORITIZED_PATTERNS for match in re.compile(pattern).findall(text)]
+
+
+def test_engine_matches_per_pattern_findall():
+    engine = get_phone_pattern_engine()
+    for text in SAMPLE_TEXTS:
+        assert engine.findall(text) == old_findall(text), text
+
+
+def test_full_number_is_kept():
+    assert '18005551234' in get_phone_pattern_engine().findall('18005551234')
+
+
+def test_match_offsets():
+    text = 'Call (212) 555-0100 now'
+    for match in get_phone_pattern_engine().finditer(text):
+        assert text[match.start():match.end()] == match.group()
@@ -0,0 +1,109 @@
+import asyncio
+import socket
+
+from phoneScrapper import resolver as resolver_module
+from phoneScrapper.resolver import DomainResolver, StubLookup
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_live_host():
+    resolver = DomainResolver(StubLookup({'example.com': ['93.184.216.34']}))
+    result = run(resolver.resolve('example.com'))
+    assert result.alive and result.reason is None and result.addresses == ['93.184.216.34']
+
+
+def test_nxdomain_is_dead():
+    resolver = DomainResolver(StubLookup())
+    result = run(resolver.resolve('missing.example'))
+    assert not result.alive and result.reason == 'nxdomain'
+
+
+def test_empty_answer_is_dead():
+    resolver = DomainResolver(StubLookup({'empty.example': []}))
+    result = run(resolver.resolve('empty.example'))
+    assert not result.alive and result.reason == 'no_address'
+
+
+def test_timeout_lets_the_domain_through_and_is_not_cached():
+    lookup = StubLookup({'slow.example': ['10.0.0.1']}, delay=0.5)
+    resolver = DomainResolver(lookup, timeout=0.05)
+    result = run(resolver.resolve('slow.example'))
+    assert result.alive and result.reason == 'timeout'
+    assert resolver.cached('slow.example') is None
+    run(resolver.resolve('slow.example'))
+    assert lookup.calls == ['slow.example', 'slow.example']
+
+
+def test_temporary_failure_lets_the_domain_through():
+    lookup = StubLookup({'flaky.example': socket.gaierror(socket.EAI_AGAIN, 'Temporary failure')})
+    resolver = DomainResolver(lookup)
+    result = run(resolver.resolve('flaky.example'))
+    assert result.alive and result.reason == 'error'
+    assert resolver.cached('flaky.example') is None
+
+
+def test_ip_addresses_are_not_looked_up():
+    lookup = StubLookup()
+    result = run(DomainResolver(lookup).resolve('127.0.0.1'))
+    assert result.alive and lookup.calls == []
+
+
+def test_answers_are_cached_until_the_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resolver_module.time, 'monotonic', lambda: now[0])
+    lookup = StubLookup({'example.com': ['93.184.216.34']})
+    resolver = DomainResolver(lookup, ttl=60)
+
+    run(resolver.resolve('example.com'))
+    run(resolver.resolve('example.com'))
+    assert lookup.calls == ['example.com']
+    assert resolver.get_stats()['dns_cache_hits'] == 1
+
+    now[0] += 61
+    run(resolver.resolve('example.com'))
+    assert lookup.calls == ['example.com', 'example.com']
+
+
+def test_nxdomain_answers_are_cached():
+    lookup = StubLookup()
+    resolver = DomainResolver(lookup)
+    run(resolver.resolve('missing.example'))
+    assert not run(resolver.resolve('missing.example')).alive
+    assert lookup.calls == ['missing.example']
+
+
+def test_concurrent_lookups_of_one_name_share_a_query():
+    lookup = StubLookup({'example.com': ['93.184.216.34']}, delay=0.05)
+    resolver = DomainResolver(lookup)
+
+    async def resolve_twice():
+        resolver.prefetch('example.com')
+        return await asyncio.gather(resolver.resolve('example.com'), resolver.resolve('example.com'))
+
+    first, second = run(resolve_twice())
+    assert first == second and lookup.calls == ['example.com']
+
+
+def test_concurrency_is_bounded():
+    active = [0, 0]  # Current and highest number of lookups under way
+
+    class CountingLookup(StubLookup):
+        async def __call__(self, host):
+            active[0] += 1
+            active[1] = max(active)
+            try:
+                return await super().__call__(host)
+            finally:
+                active[0] -= 1
+
+    hosts = [f'host{i}.example' for i in range(20)]
+    resolver = DomainResolver(CountingLookup(dict.fromkeys(hosts, ['10.0.0.1']), delay=0.01), concurrency=3)
+
+    async def resolve_all():
+        return await asyncio.gather(*(resolver.resolve(host) for host in hosts))
+
+    assert all(result.alive for result in run(resolve_all()))
+    assert active[1] == 3
@@ -0,0 +1,21 @@
+import pytest
+
+from phoneScrapper.sinks import iter_result_rows, open_result_sink
+
+
+def test_resumed_csv_sink_appends(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    for url, append in (('https://a.com', False), ('https://b.com', True)):
+        sink = open_result_sink(path, fields=('url', 'phone_number_1'), append=append)
+        sink.write({'url': url, 'phone_number_1': '111'})
+        sink.close()
+    assert list(iter_result_rows(path)) == [['url', 'phone_number_1'], ['https://a.com', '111'],
+                                            ['https://b.com', '111']]
+
+
+def test_resumed_parquet_sink_keeps_existing_results(tmp_path):
+    path = tmp_path / 'results.parquet'
+    path.write_bytes(b'PAR1 results of the interrupted run')
+    with pytest.raises(ValueError):
+        open_result_sink(str(path), append=True)
+    assert path.read_bytes() == b'PAR1 results of the interrupted run'
@@ -0,0 +1,103 @@
+import re
+
+from lxml import etree
+from scrapy.http import HtmlResponse
+
+from phoneScrapper.page_analysis import PageAnalysis
+from phoneScrapper.text_nodes import TEXT_CONTAINER_TAGS, TextIndex
+
+NESTED_PAGE = """
+<html><head><title>Acme 10001</title><style>p { color: #555 }</style></head>
+<body>
+  Loose 90210 text
+  <div id="top">Call <span>+1 (212) 555-0100</span> or <b>212-555-0199</b> today.
+    <!-- old number 212-555-0123 -->after comment 60601
+    <section><article><p>Deep <em>nested <strong>+44 20 7946 0958</strong> tail</em> more</p>
+      <ul><li>One 30301</li><li>Two<br>+91 98765 43210</li></ul>
+    </article>after article</section>
+  </div>
+  <table><tr><td>Table cell 555-0111 outside containers</td></tr></table>
+  <footer>Office: <address>123 Main St, Springfield 62701</address><!-- c -->tail text</footer>
+  <p></p><span><span><span>x</span></span></span>
+</body></html>
+"""
+
+# The container union the spider used to call string() on
+CONTAINERS_XPATH = ' | '.join(f'//{tag}' for tag in sorted(TEXT_CONTAINER_TAGS))
+
+
+def analysis_for(html):
+    return PageAnalysis(HtmlResponse('https://example.com', body=html.encode(), encoding='utf-8'))
+
+
+def elements(root):
+    return [node for node in root.iter() if isinstance(node.tag, str)]
+
+
+def test_contains_matches_string_value():
+    analysis = analysis_for(NESTED_PAGE)
+    index = analysis.text_index
+    text = analysis.root.xpath('string()')
+    assert index.text == text
+    needles = {text[start:start + 6] for start in range(0, len(text), 3)}
+    needles.update(['212-555-0123', 'today.\n', 'St, Springfield', '0958 tail', 'c -->', 'not on the page'])
+    for element in elements(analysis.root):
+        string_value = element.xpath('string()')
+        for needle in needles:
+            assert index.contains(element, needle) == (needle in string_value), (element.tag, needle)
+
+
+def test_contains_at_offset_matches_is_css_number_check():
+    analysis = analysis_for(NESTED_PAGE)
+    index = analysis.text_index
+    checked = 0
+    for text, element, offset in analysis.text_blocks:
+        parent = element.getparent()
+        if parent is None:
+            continue
+        string_value = parent.xpath('string()')
+        for match in re.finditer(r'\S+(?: \S+)?', text):
+            expected = match.group() in string_value
+            assert index.contains(parent, match.group(), offset + match.start()) == expected
+            # An offset outside the element (the first occurrence on the page) falls back to searching the span
+            assert index.contains(parent, match.group(), index.text.find(match.group())) == expected
+            assert index.contains(parent, match.group(), 0) == expected
+            checked += 1
+    assert checked > 20
+
+
+def test_text_blocks_are_the_container_text_nodes():
+    analysis = analysis_for(NESTED_PAGE)
+    expected = []
+    for node in analysis.root.xpath('//text()'):
+        owner = node.getparent().getparent() if node.is_tail else node.getparent()
+        if any(ancestor.tag in TEXT_CONTAINER_TAGS for ancestor in owner.iterancestors()) \
+                or owner.tag in TEXT_CONTAINER_TAGS:
+            expected.append((str(node), owner))
+    blocks = analysis.text_blocks
+    assert [(text, element) for text, element, _ in blocks] == expected
+    for text, _, offset in blocks:
+        assert analysis.text_index.text[offset:offset + len(text)] == text
+    assert not any('old number' in text for text, _, _ in blocks)
+
+
+def test_zip_codes_match_container_string_values():
+    analysis = analysis_for(NESTED_PAGE)
+    expected = set()
+    for container in analysis.root.xpath(CONTAINERS_XPATH):
+        expected.update(PageAnalysis.zip_pattern.findall(container.xpath('string()')))
+    assert analysis.zip_codes == expected == {'60601', '30301', '98765', '43210', '62701'}
+
+
+def test_deeply_nested_document():
+    root = element = etree.Element('div')
+    for depth in range(5000):
+        element = etree.SubElement(element, 'span')
+        element.text = f'{depth} '
+        element.tail = '.'
+    index = TextIndex(root)
+    assert index.text == root.xpath('string()')
+    assert len(index.blocks) == 2 * 5000
+    assert index.contains(element.getparent(), '4998 4999 .')
+    assert not index.contains(element, '4998')
+    assert not index.contains(element, '4998', index.text.find('4998'))
@@ -0,0 +1,26 @@
+import queue
+
+import pytest
+
+from phoneScrapper.transport import END_OF_STREAM, StreamEndedEarly, iter_item_batches
+
+
+def test_reads_until_every_producer_ended():
+    item_queue = queue.Queue()
+    for batch in ([{'url': 'a'}], END_OF_STREAM, [{'url': 'b'}], END_OF_STREAM):
+        item_queue.put(batch)
+    batches = list(iter_item_batches(item_queue, lambda: True, timeout=0.01, producers=2))
+    assert batches == [[{'url': 'a'}], [{'url': 'b'}]]
+
+
+def test_idle_callback_and_producers_gone():
+    item_queue = queue.Queue()
+    item_queue.put([{'url': 'a'}])
+    idle = []
+    alive = iter([True, True, False])
+    batches = list(iter_item_batches(item_queue, lambda: next(alive), timeout=0.01, on_idle=lambda: idle.append(1)))
+    assert batches == [[{'url': 'a'}]] and len(idle) == 3
+
+    item_queue.put(END_OF_STREAM)
+    with pytest.raises(StreamEndedEarly):
+        list(iter_item_batches(item_queue, lambda: False, timeout=0.01, producers=2, strict=True))
@@ -0,0 +1,21 @@
+import threading
+
+from phoneScrapper.transport import iter_item_batches
+from phoneScrapper.worker import CrawlWorkerPool
+
+
+def test_dead_worker_ends_its_stream(tmp_path, monkeypatch):
+    monkeypatch.setenv('SCRAPY_SETTINGS_MODULE', 'phoneScrapper.settings')
+    monkeypatch.chdir(tmp_path)
+    pool = CrawlWorkerPool(workers=2)
+    try:
+        producers = pool.crawl(domains=['127.0.0.1:9', '127.0.0.2:9'], results_path=str(tmp_path / 'results.csv'))
+        pool.processes[0].kill()  # Before it could end its stream; the other worker stays up
+        reader = threading.Thread(target=lambda: list(iter_item_batches(pool.item_queue, pool.is_alive,
+                                                                        producers=producers)), daemon=True)
+        reader.start()
+        reader.join(60)
+        assert not reader.is_alive()
+        assert pool.processes[1].is_alive()
+    finally:
+        pool.shutdown()
@@ -0,0 +1,28 @@
+from multiprocessing import Pool
+
+from phoneScrapper.zip_index import ZipIndex
+
+
+def sample_index():
+    return ZipIndex.from_pairs([('00601', 'US'), ('10001', 'US'), ('K1A 0B1', 'CA')], b'digest')
+
+
+def save_repeatedly(path):
+    for _ in range(20):
+        sample_index().save(path)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / 'zips.zidx')
+    sample_index().save(path)
+    index = ZipIndex.load(path)
+    assert index.get('601') == 'US' and index['K1A'] == 'CA' and '99999' not in index
+    assert index.source_digest.rstrip(b'\0') == b'digest'
+
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    path = str(tmp_path / 'zips.zidx')
+    with Pool(8) as pool:
+        pool.map(save_repeatedly, [path] * 8)
+    assert len(ZipIndex.load(path)) == 3
+    assert [p.name for p in tmp_path.iterdir()] == ['zips.zidx']